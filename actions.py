@@ -1,21 +1,20 @@
 from __future__ import annotations
 
 from typing import Optional, Tuple, TYPE_CHECKING
-from random import randint
-from copy import deepcopy
 
 import color
+from combat import AttackRecord
 import exceptions
 
-from entity import MobSpawner
+from entity import Item, MobSpawner
 
 if TYPE_CHECKING:
     from engine import Engine
-    from entity import Entity, Actor, Item, Resource
+    from entity import Entity, Actor, Resource
 
-# CONSTANTS FOR QUICK ACCESS:
-BASE_DODGE = 4  # will need to tweak
-ATTACK_DIE = 8
+# how far fighting wakes dormant actors
+MELEE_NOISE = 4
+GUNSHOT_NOISE = 15
 
 
 class Action:
@@ -47,8 +46,10 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
+        for item in self.engine.game_map.get_entities_at_location(
+            actor_location_x, actor_location_y
+        ):
+            if isinstance(item, Item):
                 # all the logic for stacks
                 if item.max_stack > 1:
                     stack_list = self.engine.player.inventory.instances_of(item.name)
@@ -65,7 +66,7 @@ class PickupAction(Action):
                 if len(inventory.items) >= inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full")
 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 if item.amount > 0:
                     item.parent = self.entity.inventory
                     inventory.items.append(item)
@@ -116,7 +117,9 @@ class EquipAction(Action):
 
 class WaitAction(Action):
     def perform(self) -> None:
-        pass
+        # engine counts consecutive waits to put idle AIs to sleep
+        if self.entity.ai:
+            self.entity.ai.waited = True
 
 
 class TakeStairsAction(Action):
@@ -174,84 +177,11 @@ class MeleeAction(ActionWithDirection):
             # return
             raise exceptions.Impossible("Nothing to attack.")
 
-        # damage = self.entity.fighter.power - target.fighter.defense
-        weapon = self.entity.equipment.weapon
-        attack_accuracy = self.entity.fighter.accuracy
-        if not weapon:
-            weapon = self.entity.fighter.natural_weapon
-            attack_accuracy = self.entity.fighter.natural_weapon.equippable.accuracy
-
-        critical = False
-        hit_roll = randint(1, ATTACK_DIE)
-        roll_with_modifiers = hit_roll + attack_accuracy
-        attack_desc = (
-            f"{self.entity.name.capitalize()} attacks {target.name} with {weapon.name}"
-        )
-        if hit_roll == ATTACK_DIE:
-            attack_desc = "CRITICAL HIT! " + attack_desc
-            critical = True
-        math_log = f"({roll_with_modifiers} vs {BASE_DODGE + target.fighter.dodge}"
-        if self.entity is self.engine.player:
-            attack_color = color.player_atk
-        else:
-            attack_color = color.enemy_atk
-        if roll_with_modifiers < (BASE_DODGE + target.fighter.dodge) and not critical:
-            self.engine.message_log.add_message(
-                f"{attack_desc} but misses! " + math_log + ")", attack_color
-            )
-        else:
-            ap = (
-                weapon.equippable.armor_penetration * 2
-                if critical
-                else weapon.equippable.armor_penetration
-            )
-            penetration_factor = ap - target.fighter.armor
-            math_log = math_log + f" | AP: {penetration_factor})"
-            damage = randint(1, weapon.equippable.damage)
-            print(f"initial damage: {damage}")
-
-            # conditions!
-            if penetration_factor >= 0 and weapon.equippable.effect is not None:
-                if (
-                    target.fighter.conditions.get(weapon.equippable.effect.name)
-                    is not None
-                ):
-                    target.fighter.conditions[
-                        weapon.equippable.effect.name
-                    ].extend_condition()
-                else:
-                    effect = deepcopy(weapon.equippable.effect)
-                    target.fighter.conditions[effect.name] = effect
-                    effect.parent = target
-                    self.engine.message_log.add_message(
-                        target.name + effect.afflict_message
-                    )
-
-            if penetration_factor > 0:
-                damage *= penetration_factor + 1
-                print(
-                    f"damage after penetration multiplier ({penetration_factor}): {damage}"
-                )
-            elif penetration_factor < 0:
-                damage = damage // (abs(penetration_factor) + 1)
-                print(
-                    f"damage after penetration multiplier ({penetration_factor}): {damage}"
-                )
-            if damage > 0:
-                # print(f'{attack_desc} for {damage} hit points.')
-                self.engine.message_log.add_message(
-                    f"{attack_desc} for {damage} hit points " + math_log, attack_color
-                )
-                target.fighter.hp -= damage
-            else:
-                # print(f'{attack_desc} but does no damage')
-                self.engine.message_log.add_message(
-                    f"{attack_desc} but fails to penetrate their armor " + math_log,
-                    attack_color,
-                )
-
-        # placeholder lmao
-        # print(f'You kick the {target.name}, dealing 1,000,000 damage')
+        game_map = self.engine.game_map
+        game_map.make_noise(self.entity.x, self.entity.y, MELEE_NOISE)
+        game_map.wake(target)
+        # rolled and applied by the engine's CombatResolver
+        self.engine.combat.attack(AttackRecord.melee(self.entity, target))
 
 
 class MineAction(ActionWithDirection):
@@ -266,8 +196,6 @@ class MineAction(ActionWithDirection):
             raise exceptions.Impossible("Nothing to mine.")
 
         # prob dont want this in play, for testing we leave it on for now
-        mine_desc = f"{self.entity.name.capitalize()} mines {target.name}"
-
         if self.entity.faction == "player":
             msg_color = color.ally_mine
         else:
@@ -276,7 +204,9 @@ class MineAction(ActionWithDirection):
         target.harvestable.decrement()
         self.entity.inventory.items.append(target.harvestable.resource_item)
 
-        self.engine.message_log.add_message(mine_desc, msg_color)
+        self.engine.message_log.add_message(
+            "%s mines %s", msg_color, self.entity.name.capitalize(), target.name
+        )
 
 
 class DepositAction(ActionWithDirection):
@@ -290,89 +220,28 @@ class DepositAction(ActionWithDirection):
         if not target:
             raise exceptions.Impossible("No spawner to deposit.")
         deposit_amt = len(self.entity.inventory.items)
-        deposit_msg = f"{self.entity.name} deposits {deposit_amt} into {target.name}"
-        msg_color = color.ally_mine
         target.spawner.add_to_bank(deposit_amt)
         self.entity.inventory.clear()
-        self.engine.message_log.add_message(deposit_msg, msg_color)
+        self.engine.message_log.add_message(
+            "%s deposits %d into %s",
+            color.ally_mine,
+            self.entity.name,
+            deposit_amt,
+            target.name,
+        )
 
 
 class RangedAction(ActionWithTarget):
     def perform(self) -> None:
         if self.entity.equipment.ranged is None:
             raise exceptions.Impossible("You do not have a ranged weapon equipped!")
-        weapon = self.entity.equipment.ranged
         target = self.target_actor
         if not target:
             raise exceptions.Impossible("Nothing to shoot there.")
-        critical = False
-        hit_roll = randint(1, ATTACK_DIE)
-        roll_with_modifiers = hit_roll + self.entity.fighter.accuracy
-        attack_desc = (
-            f"{self.entity.name.capitalize()} shoots {target.name} with {weapon.name}"
-        )
-        if hit_roll == ATTACK_DIE:
-            attack_desc = "CRITICAL HIT! " + attack_desc
-            critical = True
-        math_log = f"({roll_with_modifiers} vs {BASE_DODGE + target.fighter.dodge}"
-        if self.entity is self.engine.player:
-            attack_color = color.player_atk
-        else:
-            attack_color = color.enemy_atk
-        if roll_with_modifiers < (BASE_DODGE + target.fighter.dodge) and not critical:
-            self.engine.message_log.add_message(
-                f"{attack_desc} but misses! " + math_log + ")", attack_color
-            )
-        else:
-            ap = (
-                weapon.equippable.armor_penetration * 2
-                if critical
-                else weapon.equippable.armor_penetration
-            )
-            penetration_factor = ap - target.fighter.armor
-            math_log = math_log + f" | AP: {penetration_factor})"
-            damage = randint(1, weapon.equippable.damage)
-            print(f"initial damage: {damage}")
-
-            # conditions!
-            if penetration_factor >= 0 and weapon.equippable.effect is not None:
-                if (
-                    target.fighter.conditions.get(weapon.equippable.effect.name)
-                    is not None
-                ):
-                    target.fighter.conditions[
-                        weapon.equippable.effect.name
-                    ].extend_condition()
-                else:
-                    effect = deepcopy(weapon.equippable.effect)
-                    target.fighter.conditions[effect.name] = effect
-                    effect.parent = target
-                    self.engine.message_log.add_message(
-                        target.name + effect.afflict_message
-                    )
-
-            if penetration_factor > 0:
-                damage *= penetration_factor + 1
-                print(
-                    f"damage after penetration multiplier ({penetration_factor}): {damage}"
-                )
-            elif penetration_factor < 0:
-                damage = damage // (abs(penetration_factor) + 1)
-                print(
-                    f"damage after penetration multiplier ({penetration_factor}): {damage}"
-                )
-            if damage > 0:
-                # print(f'{attack_desc} for {damage} hit points.')
-                self.engine.message_log.add_message(
-                    f"{attack_desc} for {damage} hit points " + math_log, attack_color
-                )
-                target.fighter.hp -= damage
-            else:
-                # print(f'{attack_desc} but does no damage')
-                self.engine.message_log.add_message(
-                    f"{attack_desc} but fails to penetrate their armor " + math_log,
-                    attack_color,
-                )
+        game_map = self.engine.game_map
+        game_map.make_noise(self.entity.x, self.entity.y, GUNSHOT_NOISE)
+        game_map.wake(target)
+        self.engine.combat.attack(AttackRecord.ranged(self.entity, target))
         # add ammo later!
         # ammo = [item for item in self.entity.inventory.items if item.name]
         # if weapon.ammo_type not in self.entity.inventory.items:
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# nodes a bounded search may expand before giving up on the query
+MAX_EXPANSIONS = 256
+
+Node = Tuple[int, int]
+
+_STEPS = [
+    (dx, dy, 3 if dx and dy else 2)
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    if dx or dy
+]
+
+
+def astar(
+    start: Node,
+    goal: Node,
+    edges: Callable[[Node], Iterable[Tuple[Node, int]]],
+    heuristic: Callable[[Node], float],
+    max_expansions: Optional[int] = None,
+) -> Optional[List[Node]]:
+    """
+    A* over any graph: edges(node) gives (neighbour, step cost) pairs and
+    heuristic(node) the estimated cost left to the goal. Returns the path from
+    start (excluded) to goal, [] when the goal is unreachable, and None when
+    more than max_expansions nodes got expanded first.
+    """
+    best: Dict[Node, int] = {start: 0}
+    came_from: Dict[Node, Node] = {}
+    closed = set()
+    frontier: List[Tuple[float, int, Node]] = [(0, 0, start)]
+    order = 1  # tie-break so nodes never get compared
+    expansions = 0
+    while frontier:
+        _, _, node = heapq.heappop(frontier)
+        if node == goal:
+            path = [goal]
+            while path[-1] != start:
+                path.append(came_from[path[-1]])
+            path.pop()
+            return path[::-1]
+        if node in closed:
+            continue  # stale entry, a shorter route got here first
+        closed.add(node)
+        expansions += 1
+        if max_expansions is not None and expansions > max_expansions:
+            return None
+
+        distance = best[node]
+        for other, step in edges(node):
+            new_distance = distance + step
+            if new_distance < best.get(other, new_distance + 1):
+                best[other] = new_distance
+                came_from[other] = node
+                estimate = new_distance + heuristic(other)
+                heapq.heappush(frontier, (estimate, order, other))
+                order += 1
+    return []
+
+
+def bounded_astar(
+    cost: np.ndarray,
+    start: Node,
+    goal: Node,
+    max_expansions: int = MAX_EXPANSIONS,
+) -> Optional[List[Node]]:
+    """
+    A* over a GameMap.path_cost style array (0 = wall, cardinal steps cost
+    2 * tile cost, diagonals 3 * tile cost), from start (excluded) to goal.
+
+    Unlike a tcod Pathfinder this never touches more of the map than it
+    expands, so a short chase costs a handful of nodes instead of a full-map
+    allocation. Returns [] when the goal is unreachable, and None when the
+    budget ran out first so the caller can fall back to something else.
+    """
+    width, height = cost.shape
+    goal_x, goal_y = goal
+
+    def edges(node: Node) -> Iterator[Tuple[Node, int]]:
+        x, y = node
+        for dx, dy, step in _STEPS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            tile_cost = cost[nx, ny]
+            if tile_cost:
+                yield (nx, ny), step * int(tile_cost)
+
+    def heuristic(node: Node) -> int:
+        hx, hy = abs(node[0] - goal_x), abs(node[1] - goal_y)
+        return 2 * max(hx, hy) + min(hx, hy)
+
+    return astar(start, goal, edges, heuristic, max_expansions)
@@ -0,0 +1,204 @@
+"""
+Run lots of seeded headless toxic_crisis games across all cores and report
+how each scenario played out: win rate, turns survived, score and where the
+time went. No window or GPU needed. Every option taking several values adds a
+dimension to the sweep, each combination plays --games games.
+
+    python batch_runner.py --games 200 --max-snakes 10 25 40 --police-score 300 500
+    python batch_runner.py --games 1000 --poison-die 1 2 4 --csv poison.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from engine import OUTCOME_ARREST, OUTCOME_DEAD, OUTCOME_VICTORY, POLICE_SCORE
+import entity_factories
+import headless
+from procgen import SNAKES
+
+# per-game timings averaged into the report
+TIMINGS = ("setup_seconds", "player_seconds", "enemy_seconds", "fov_seconds")
+# columns of a summary row, in order
+SUMMARY_FIELDS = [
+    "max_snakes",
+    "poison_die",
+    "police_score",
+    "games",
+    "win_rate",
+    "death_rate",
+    "arrest_rate",
+    "timeout_rate",
+    "mean_turns",
+    "median_turns",
+    "mean_score",
+    "max_score",
+    *("mean_" + timing for timing in TIMINGS),
+    "ms_per_turn",
+]
+
+
+def play(task: Dict) -> Dict:
+    """One game in a worker process. task is a scenario plus seed and policy."""
+    poison = entity_factories.mamba_madness
+    default_die = poison.damage_die
+    # prototypes are per process, so tweaking this one only touches the game
+    # this worker is playing
+    poison.damage_die = task["poison_die"]
+    try:
+        result = headless.run_game(
+            headless.POLICIES[task["policy"]],
+            max_turns=task["max_turns"],
+            surrender=task["surrender"],
+            seed=task["seed"],
+            # no wall clock AI budget: a game has to play the same whatever
+            # the load or --workers, or the scenarios aren't comparable
+            ai_budget=None,
+            snakes=(min(SNAKES[0], task["max_snakes"]), task["max_snakes"]),
+            police_score=task["police_score"],
+        )
+    finally:
+        poison.damage_die = default_die
+    result.update(task)
+    return result
+
+
+def make_tasks(args: argparse.Namespace) -> List[Dict]:
+    tasks = []
+    seed = args.seed
+    for max_snakes, poison_die, police_score in itertools.product(
+        args.max_snakes, args.poison_die, args.police_score
+    ):
+        for _ in range(args.games):
+            tasks.append(
+                {
+                    "max_snakes": max_snakes,
+                    "poison_die": poison_die,
+                    "police_score": police_score,
+                    "policy": args.policy,
+                    "max_turns": args.turns,
+                    "surrender": args.surrender,
+                    "seed": seed,
+                }
+            )
+            seed += 1
+    return tasks
+
+
+def summarize(results: Iterable[Dict]) -> List[Dict]:
+    """Aggregate game results into one row per scenario."""
+    scenarios: Dict[tuple, List[Dict]] = {}
+    for result in results:
+        key = (result["max_snakes"], result["poison_die"], result["police_score"])
+        scenarios.setdefault(key, []).append(result)
+
+    rows = []
+    for (max_snakes, poison_die, police_score), games in sorted(scenarios.items()):
+        outcomes = [game["outcome"] for game in games]
+        turns = [game["turns"] for game in games]
+        scores = [game["score"] for game in games]
+        row = {
+            "max_snakes": max_snakes,
+            "poison_die": poison_die,
+            "police_score": police_score,
+            "games": len(games),
+            "win_rate": round(outcomes.count(OUTCOME_VICTORY) / len(games), 4),
+            "death_rate": round(outcomes.count(OUTCOME_DEAD) / len(games), 4),
+            "arrest_rate": round(outcomes.count(OUTCOME_ARREST) / len(games), 4),
+            "timeout_rate": round(outcomes.count("timeout") / len(games), 4),
+            "mean_turns": round(statistics.mean(turns), 2),
+            "median_turns": statistics.median(turns),
+            "mean_score": round(statistics.mean(scores), 2),
+            "max_score": max(scores),
+        }
+        for timing in TIMINGS:
+            row["mean_" + timing] = round(
+                statistics.mean(game[timing] for game in games), 5
+            )
+        total_turns = max(sum(turns), 1)
+        row["ms_per_turn"] = round(
+            sum(game["seconds"] for game in games) / total_turns * 1000, 4
+        )
+        rows.append(row)
+    return rows
+
+
+def write_csv(path: str, rows: List[Dict]) -> None:
+    # no rows still gets a header
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100, help="games per scenario")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="processes to use"
+    )
+    parser.add_argument(
+        "--policy", choices=sorted(headless.POLICIES), default="hunter"
+    )
+    parser.add_argument("--turns", type=int, default=1000, help="max turns per game")
+    parser.add_argument("--surrender", action="store_true", help="go peacefully")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument(
+        "--max-snakes", type=int, nargs="+", default=[SNAKES[1]], metavar="N"
+    )
+    parser.add_argument(
+        "--poison-die",
+        type=int,
+        nargs="+",
+        default=[entity_factories.mamba_madness.damage_die],
+        metavar="N",
+    )
+    parser.add_argument(
+        "--police-score", type=int, nargs="+", default=[POLICE_SCORE], metavar="N"
+    )
+    parser.add_argument("--csv", help="write the scenario summary here")
+    parser.add_argument("--json", help="write the summary and every game here")
+    args = parser.parse_args(argv)
+
+    tasks = make_tasks(args)
+    started = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(args.workers) as pool:
+        # games take wildly different times, hand them out a few at a time
+        chunksize = max(1, len(tasks) // (args.workers * 8))
+        for result in pool.imap_unordered(play, tasks, chunksize=chunksize):
+            results.append(result)
+            print(f"\r{len(results)}/{len(tasks)} games", end="", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+
+    rows = summarize(results)
+    for row in rows:
+        print(", ".join(f"{k}={v}" for k, v in row.items()))
+    print(
+        f"{len(results)} games in {elapsed:.1f}s on {args.workers} workers "
+        f"({len(results) / elapsed:.1f} games/s)"
+    )
+
+    if args.csv:
+        write_csv(args.csv, rows)
+    if args.json:
+        results.sort(key=lambda result: result["seed"])
+        with open(args.json, "w") as f:
+            json.dump(
+                {"options": vars(args), "scenarios": rows, "games": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Memory benchmark for the slotted entity/component/message classes.
+
+For each class it compares the size of a slotted instance against the same
+attributes held in a plain object's __dict__ (what the classes used before
+__slots__), then spawns a batch of snakes/cops and reports allocated bytes
+per entity with tracemalloc.
+
+    python bench_memory.py [count]
+"""
+
+import sys
+import tracemalloc
+
+import entity_factories
+from components.base_component import state_names
+from message_log import Message
+
+
+class _DictBacked:
+    # stand-in for the old, unslotted classes
+    pass
+
+
+def slotted_size(obj) -> int:
+    return sys.getsizeof(obj)
+
+
+def dict_size(obj) -> int:
+    plain = _DictBacked()
+    for name in state_names(obj):
+        setattr(plain, name, getattr(obj, name))
+    return sys.getsizeof(plain) + sys.getsizeof(plain.__dict__)
+
+
+def per_class_report() -> int:
+    cop = entity_factories.cop.clone()
+    samples = [
+        ("Actor", cop),
+        ("Item", cop.inventory.items[0]),
+        ("Fighter", cop.fighter),
+        ("Equipment", cop.equipment),
+        ("Inventory", cop.inventory),
+        ("Level", cop.level),
+        ("PoisonCondition", entity_factories.mamba_madness.clone()),
+        ("Message", Message("Park Cop attacks Green Mamba", (255, 255, 255))),
+    ]
+
+    print(f"{'class':<30}{'slots':>8}{'__dict__':>10}{'saved':>8}")
+    actor_saving = 0
+    for label, obj in samples:
+        slots, plain = slotted_size(obj), dict_size(obj)
+        print(f"{label:<30}{slots:>8}{plain:>10}{plain - slots:>8}")
+        if label in ("Actor", "Fighter", "Equipment", "Inventory", "Level"):
+            actor_saving += plain - slots
+    print(f"\nsaved per actor (entity + components): {actor_saving} bytes")
+    return actor_saving
+
+
+def spawn_report(count: int) -> None:
+    for name in ("snake", "cop"):
+        prototype = getattr(entity_factories, name)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        spawned = [prototype.clone() for _ in range(count)]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        print(f"{count} x {name}: {allocated / count:.0f} bytes per entity")
+        del spawned
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    per_class_report()
+    print()
+    spawn_report(count)
+
+
+if __name__ == "__main__":
+    main()
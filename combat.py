@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import functools
+from typing import List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+import color
+import tracing
+
+if TYPE_CHECKING:
+    from condition import Condition
+    from engine import Engine
+    from entity import Actor, Item
+
+BASE_DODGE = 4  # will need to tweak
+ATTACK_DIE = 8
+# uniform rolls fetched from the combat generator per numpy call
+ROLL_BLOCK = 512
+
+MISS_MESSAGE = "%s%s %s %s with %s but misses! (%d vs %d)"
+HIT_MESSAGE = "%s%s %s %s with %s for %d hit points (%d vs %d | AP: %d)"
+NO_PENETRATION_MESSAGE = (
+    "%s%s %s %s with %s but fails to penetrate their armor (%d vs %d | AP: %d)"
+)
+
+
+def roll_outcome(hit_roll, damage_roll, accuracy, dodge, armor_penetration, armor):
+    """
+    The combat math on plain ints or on arrays of rolls and stats (anything
+    that broadcasts): returns critical, hit, penetration and damage. Shared by
+    the resolver and the odds tables so they can't drift apart. Plain
+    arithmetic only, no numpy calls, so a single attack stays cheap.
+    """
+    critical = hit_roll == ATTACK_DIE
+    hit = critical | (hit_roll + accuracy >= BASE_DODGE + dodge)
+    # crits double armor penetration. every point of penetration over the
+    # armor multiplies the damage, every point short of it divides it
+    penetration = (1 + critical) * armor_penetration - armor
+    over = penetration * (penetration > 0)
+    short = -penetration * (penetration < 0)
+    damage = damage_roll * (over + 1) // (short + 1)
+    return critical, hit, penetration, damage
+
+
+class AttackOdds:
+    """
+    Exact outcome odds of one attack, worked out over every hit and damage
+    roll. distribution[n] is the chance of dealing n damage, misses count as 0.
+    Get these from attack_odds(), which caches them.
+    """
+
+    def __init__(
+        self,
+        accuracy: int,
+        dodge: int,
+        armor_penetration: int,
+        armor: int,
+        damage_die: int,
+    ):
+        hit_roll = np.arange(1, ATTACK_DIE + 1)[:, None]
+        damage_roll = np.arange(1, damage_die + 1)[None, :]
+        critical, hit, _, damage = roll_outcome(
+            hit_roll, damage_roll, accuracy, dodge, armor_penetration, armor
+        )
+        critical, hit, damage = np.broadcast_arrays(critical, hit, damage)
+        cases = damage.size
+        self.hit_chance = float(hit.sum()) / cases
+        self.crit_chance = float(critical.sum()) / cases
+        damage = np.where(hit, damage, 0)
+        self.distribution = np.bincount(damage.ravel()) / cases
+        self.distribution.flags.writeable = False  # shared by the cache
+        self.expected_damage = float(damage.mean())
+
+    def sample(self, rng: np.random.Generator, size: Optional[int] = None):
+        """Damage dealt by size attacks (one int if size is None)."""
+        return rng.choice(len(self.distribution), size=size, p=self.distribution)
+
+
+@functools.lru_cache(maxsize=None)
+def attack_odds(
+    accuracy: int, dodge: int, armor_penetration: int, armor: int, damage_die: int
+) -> AttackOdds:
+    # stats are a handful of small ints, the table stays tiny
+    return AttackOdds(accuracy, dodge, armor_penetration, armor, damage_die)
+
+
+class AttackRecord:
+    """
+    One attack, everything the roll needs read off the attacker, weapon and
+    target when it was made. MeleeAction and RangedAction only build these.
+    """
+
+    __slots__ = (
+        "attacker",
+        "target",
+        "weapon",
+        "verb",
+        "accuracy",
+        "armor_penetration",
+        "damage_die",
+        "effect",
+        "dodge",
+        "armor",
+    )
+
+    def __init__(
+        self, attacker: Actor, target: Actor, weapon: Item, accuracy: int, verb: str
+    ):
+        self.attacker = attacker
+        self.target = target
+        self.weapon = weapon
+        self.verb = verb
+        self.accuracy = accuracy
+        self.armor_penetration = weapon.equippable.armor_penetration
+        self.damage_die = weapon.equippable.damage
+        self.effect: Optional[Condition] = weapon.equippable.effect
+        self.dodge = target.fighter.dodge
+        self.armor = target.fighter.armor
+
+    @classmethod
+    def melee(cls, attacker: Actor, target: Actor) -> AttackRecord:
+        # fists (or fangs) when nothing is wielded
+        weapon = attacker.equipment.weapon
+        accuracy = attacker.fighter.accuracy
+        if not weapon:
+            weapon = attacker.fighter.natural_weapon
+            accuracy = weapon.equippable.accuracy
+        return cls(attacker, target, weapon, accuracy, "attacks")
+
+    @classmethod
+    def ranged(cls, attacker: Actor, target: Actor) -> AttackRecord:
+        weapon = attacker.equipment.ranged
+        return cls(attacker, target, weapon, attacker.fighter.accuracy, "shoots")
+
+    @property
+    def odds(self) -> AttackOdds:
+        return attack_odds(
+            self.accuracy,
+            self.dodge,
+            self.armor_penetration,
+            self.armor,
+            self.damage_die,
+        )
+
+
+class CombatResolver:
+    """
+    Resolves attacks, on the spot or queued up while batching and rolled
+    together by flush(). hp loss, conditions and messages are applied in the
+    order the attacks were made. The enemy phase flushes after every actor's
+    action, so nobody acts on a target that should already be dead.
+
+    Nearly every batch is a single attack, and numpy costs more than it saves
+    on one, so those get the math on plain ints. Only a batch of several does
+    it on arrays. Either way the rolls come off a buffer of uniform draws
+    fetched from the combat generator a block at a time, two per attack in
+    attack order, so batching never changes an outcome.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.batching = False
+        self.pending: List[AttackRecord] = []
+        self.rolls: List[float] = []
+        self.next_roll = 0
+
+    def take_rolls(self, count: int) -> List[float]:
+        if self.next_roll + count > len(self.rolls):
+            fresh = self.engine.rng.combat_numpy.random(max(ROLL_BLOCK, count))
+            self.rolls = self.rolls[self.next_roll :] + fresh.tolist()
+            self.next_roll = 0
+        start = self.next_roll
+        self.next_roll += count
+        return self.rolls[start : self.next_roll]
+
+    def attack(self, record: AttackRecord) -> None:
+        if self.batching:
+            self.pending.append(record)
+        else:
+            self.resolve([record])
+
+    def flush(self) -> None:
+        records, self.pending = self.pending, []
+        if records:
+            self.resolve(records)
+
+    def resolve(self, records: List[AttackRecord]) -> None:
+        if len(records) == 1:
+            self.resolve_one(records[0])
+        else:
+            self.resolve_many(records)
+
+    def resolve_one(self, record: AttackRecord) -> None:
+        hit_draw, damage_draw = self.take_rolls(2)
+        hit_roll = 1 + int(hit_draw * ATTACK_DIE)
+        damage_roll = 1 + int(damage_draw * record.damage_die)
+        critical, hit, penetration, damage = roll_outcome(
+            hit_roll,
+            damage_roll,
+            record.accuracy,
+            record.dodge,
+            record.armor_penetration,
+            record.armor,
+        )
+        self._apply(
+            record,
+            hit_roll + record.accuracy,
+            BASE_DODGE + record.dodge,
+            critical,
+            hit,
+            penetration,
+            damage_roll,
+            damage,
+        )
+
+    def resolve_many(self, records: List[AttackRecord]) -> None:
+        count = len(records)
+        accuracy = np.fromiter((r.accuracy for r in records), np.int32, count)
+        dodge = np.fromiter((r.dodge for r in records), np.int32, count)
+        armor = np.fromiter((r.armor for r in records), np.int32, count)
+        armor_penetration = np.fromiter(
+            (r.armor_penetration for r in records), np.int32, count
+        )
+        damage_die = np.fromiter((r.damage_die for r in records), np.int32, count)
+
+        draws = np.array(self.take_rolls(2 * count)).reshape(count, 2)
+        hit_roll = 1 + (draws[:, 0] * ATTACK_DIE).astype(np.int32)
+        damage_roll = 1 + (draws[:, 1] * damage_die).astype(np.int32)
+
+        critical, hit, penetration, damage = roll_outcome(
+            hit_roll, damage_roll, accuracy, dodge, armor_penetration, armor
+        )
+        rolled = hit_roll + accuracy
+        to_beat = BASE_DODGE + dodge
+
+        for i, record in enumerate(records):
+            self._apply(
+                record,
+                int(rolled[i]),
+                int(to_beat[i]),
+                bool(critical[i]),
+                bool(hit[i]),
+                int(penetration[i]),
+                int(damage_roll[i]),
+                int(damage[i]),
+            )
+
+    def _apply(
+        self,
+        record: AttackRecord,
+        rolled: int,
+        to_beat: int,
+        critical: bool,
+        hit: bool,
+        penetration: int,
+        damage_roll: int,
+        damage: int,
+    ) -> None:
+        attacker, target = record.attacker, record.target
+        # an earlier attack in the batch may have killed either of them
+        if not attacker.is_alive or not target.is_alive:
+            return
+        message_log = self.engine.message_log
+
+        # messages are templates, formatted only if they ever get shown
+        who = (
+            "CRITICAL HIT! " if critical else "",
+            attacker.name.capitalize(),
+            record.verb,
+            target.name,
+            record.weapon.name,
+        )
+        if attacker is self.engine.player:
+            attack_color = color.player_atk
+        else:
+            attack_color = color.enemy_atk
+
+        if not hit:
+            message_log.add_message(MISS_MESSAGE, attack_color, *who, rolled, to_beat)
+            return
+
+        tracing.combat.debug("initial damage: %d", damage_roll)
+
+        # conditions!
+        effect = record.effect
+        if penetration >= 0 and effect is not None:
+            existing = target.fighter.conditions.get(effect.name)
+            if existing is not None:
+                existing.extend_condition()
+            else:
+                effect = effect.clone()
+                target.fighter.add_condition(effect)
+                message_log.add_message(
+                    "%s%s", color.white, target.name, effect.afflict_message
+                )
+
+        if penetration:
+            tracing.combat.debug(
+                "damage after penetration multiplier (%d): %d", penetration, damage
+            )
+        if damage > 0:
+            message_log.add_message(
+                HIT_MESSAGE, attack_color, *who, damage, rolled, to_beat, penetration
+            )
+            target.fighter.hp -= damage
+        else:
+            message_log.add_message(
+                NO_PENETRATION_MESSAGE, attack_color, *who, rolled, to_beat, penetration
+            )
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import random
-from typing import List, Optional, Tuple, TYPE_CHECKING
+import copy
+from typing import Hashable, List, Optional, Tuple, TYPE_CHECKING
 
-import numpy as np
 import tcod
 
 from actions import (
@@ -18,41 +17,103 @@ from actions import (
 )
 # from components.base_component import BaseComponent
 
+from astar import bounded_astar
 from entity import MobSpawner
+from path_cache import PathCache, next_step_open
 
 if TYPE_CHECKING:
-    from entity import Actor, Resource
+    from entity import Actor, Entity, Resource
 
 
 # class BaseAI(Action, BaseComponent):
 class BaseAI(Action):
     # entity: Actor
 
+    # AIs that only ever wait while nothing hostile is around can be put to
+    # sleep by the engine (see GameMap.sleep) until something wakes them
+    can_sleep = False
+    # AIs that act purely off timed events stay out of the turn scheduler
+    takes_turns = True
+    idle_turns = 0  # consecutive turns spent waiting
+    waited = False  # set by WaitAction
+    # found by the engine before anyone moves, see take_target
+    target: Optional[Entity] = None
+
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def perform_degraded(self) -> None:
+        # what to do once the engine's per-turn AI budget has run out. cheap
+        # AIs just act normally, the pathing ones override this
+        return self.perform()
+
+    def find_target(self) -> Optional[Entity]:
+        # whatever this AI is after right now, if anything
+        return None
+
+    def path_request(self, target: Optional[Entity]) -> Optional[Hashable]:
+        # flow field key this AI will path with this turn towards target (from
+        # find_target), if any. Engine collects these before anyone moves and
+        # builds the fields in one batch
+        return None
+
+    def take_target(self) -> Optional[Entity]:
+        # the target the engine found for this turn, unless it died or left
+        # the map since. later actions of a fast actor search again
+        target, self.target = self.target, None
+        if (
+            target is None
+            or target.store_id is None
+            or not getattr(target, "is_alive", True)
+        ):
+            return self.find_target()
+        return target
+
+    def clone(self, entity: Actor) -> BaseAI:
+        # used by Actor.clone, the copy acts for the new entity
+        clone = copy.copy(self)
+        clone.entity = entity
+        clone.target = None
+        return clone
+
     # is this useful? idk
     def get_distance(self, x: int, y: int):
         dx = x - self.entity.x
         dy = y - self.entity.y
         return max(abs(dx), abs(dy))
 
+    def step_towards(self, x: int, y: int) -> None:
+        # straight-line step, no pathing. raises Impossible if it's blocked
+        dx = (x > self.entity.x) - (x < self.entity.x)
+        dy = (y > self.entity.y) - (y < self.entity.y)
+        if not dx and not dy:
+            return WaitAction(self.entity).perform()
+        return MovementAction(self.entity, dx, dy).perform()
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         # list bc it returns a coordinate path
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
+        hierarchy = self.entity.gamemap.hierarchy
+        if hierarchy and self.get_distance(dest_x, dest_y) > hierarchy.cluster_size:
+            # long trip on a big map, go cluster to cluster. the path only
+            # covers the first stretch, callers replan when it runs out
+            return hierarchy.find_path((self.entity.x, self.entity.y), (dest_x, dest_y))
 
-        for entity in self.entity.gamemap.entities:
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                cost[entity.x, entity.y] += 10
+        cost = self.entity.gamemap.path_cost
+
+        # short trips are nearly free with a bounded search, only fall back to
+        # a full pathfinder when it runs out of budget
+        path = bounded_astar(cost, (self.entity.x, self.entity.y), (dest_x, dest_y))
+        if path is not None:
+            return path
 
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
 
         pathfinder.add_root((self.entity.x, self.entity.y))
 
-        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
+        full_path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
 
-        return [(index[0], index[1]) for index in path]
+        return [(index[0], index[1]) for index in full_path]
 
     # def get_closest_hostile(self, faction: str =''):
 
@@ -66,6 +127,12 @@ class ConfusedEnemy(BaseAI):  # move randomly, attacking any actor it runs into
         self.previous_ai = previous_ai
         self.turns_remaining = turns_remaining
 
+    def clone(self, entity: Actor) -> ConfusedEnemy:
+        clone = super().clone(entity)
+        if self.previous_ai:
+            clone.previous_ai = self.previous_ai.clone(entity)
+        return clone
+
     def perform(self) -> None:
         if self.turns_remaining <= 0:
             self.engine.message_log.add_message(
@@ -73,7 +140,7 @@ class ConfusedEnemy(BaseAI):  # move randomly, attacking any actor it runs into
             )
             self.entity.ai = self.previous_ai
         else:
-            direction_x, direction_y = random.choice(
+            direction_x, direction_y = self.engine.rng.ai.choice(
                 [
                     (-1, -1),
                     (0, 1),
@@ -99,67 +166,143 @@ class Combatant(BaseAI):
 
     """
 
+    can_sleep = True
+
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: List[Tuple[int, int]] = []
+        self.path_cache = PathCache()
+
+    def clone(self, entity: Actor) -> BaseAI:
+        clone = super().clone(entity)
+        clone.path_cache = self.path_cache.copy()
+        return clone
 
     def get_closest_enemy(self) -> Actor:
-        return self.entity.get_closest_entity(
-            [
-                actor
-                for actor in self.entity.gamemap.actors
-                if actor.faction != self.entity.faction
-            ]
+        return self.entity.gamemap.get_closest_enemy(self.entity)
+
+    def find_target(self) -> Optional[Actor]:
+        return self.get_closest_enemy()
+
+    def uses_flow_fields(self) -> bool:
+        # a whole-map sweep per target set stops paying off on big maps,
+        # those go through get_path_to and the cluster abstraction instead
+        return self.engine.game_map.hierarchy is None
+
+    def needs_path(self, target: Actor) -> bool:
+        return not self.path_cache.is_valid(
+            self.engine.game_map,
+            self.entity.x,
+            self.entity.y,
+            target.x,
+            target.y,
+        )
+
+    def path_request(self, target: Optional[Actor]) -> Optional[Hashable]:
+        # mirrors perform: only a visible actor out of melee range replans
+        if not self.uses_flow_fields():
+            return None
+        if not self.engine.game_map.visible[self.entity.x, self.entity.y]:
+            return None
+        if not target:
+            return None
+        if self.get_distance(target.x, target.y) <= 1 or not self.needs_path(target):
+            return None
+        return self.engine.flow_fields.hostiles_key(self.entity)
+
+    def plan_path(self, target: Actor) -> None:
+        # keep the cached path unless the target moved off or it got blocked
+        if not self.path_cache.lookup(
+            self.engine.game_map,
+            self.engine.path_cache_stats,
+            self.entity.x,
+            self.entity.y,
+            target.x,
+            target.y,
+        ):
+            if self.uses_flow_fields():
+                path = self.engine.flow_fields.path_to_hostiles(self.entity)
+            else:
+                path = self.get_path_to(target.x, target.y)
+            self.path_cache.store(path, target.x, target.y)
+
+    def follow_path(self) -> None:
+        dest_x, dest_y = self.path_cache.pop_step()
+        return MovementAction(
+            self.entity,
+            dest_x - self.entity.x,
+            dest_y - self.entity.y,
+        ).perform()
+
+    def in_range(self, target: Actor) -> bool:
+        return (
+            self.engine.game_map.visible[self.entity.x, self.entity.y]
+            and self.get_distance(target.x, target.y) <= 1
         )
 
+    def attack(self, target: Actor) -> None:
+        return MeleeAction(
+            self.entity, target.x - self.entity.x, target.y - self.entity.y
+        ).perform()
+
+    def perform_degraded(self) -> None:
+        # no pathing: hit whoever is in range like perform would, otherwise
+        # keep walking the cached path while its next step is open, else
+        # head straight for where the target was last planned for
+        target = self.take_target()
+        if target and self.in_range(target):
+            return self.attack(target)
+        path = self.path_cache.path
+        if path:
+            if next_step_open(self.engine.game_map, path, self.entity.x, self.entity.y):
+                return self.follow_path()
+            return WaitAction(self.entity).perform()
+        if self.path_cache.target_xy:
+            return self.step_towards(*self.path_cache.target_xy)
+        return WaitAction(self.entity).perform()
+
     def perform(self) -> None:
         # target = self.engine.player
-        target = self.get_closest_enemy()
+        target = self.take_target()
 
         if target:
-            dx = target.x - self.entity.x
-            dy = target.y - self.entity.y
-            # look up Chebyshev distance
-            distance = max(abs(dx), abs(dy))
+            if self.in_range(target):
+                return self.attack(target)
 
             if self.engine.game_map.visible[self.entity.x, self.entity.y]:
-                if distance <= 1:
-                    return MeleeAction(self.entity, dx, dy).perform()
-
-                self.path = self.get_path_to(target.x, target.y)
+                self.plan_path(target)
 
-            if self.path:
-                dest_x, dest_y = self.path.pop(0)
-                return MovementAction(
-                    self.entity,
-                    dest_x - self.entity.x,
-                    dest_y - self.entity.y,
-                ).perform()
+            if self.path_cache.path:
+                return self.follow_path()
 
         return WaitAction(self.entity).perform()
 
 
 class CopAI(Combatant):
+    def path_request(self, target: Optional[Actor]) -> Optional[Hashable]:
+        # cops plan every turn, seen or not
+        if not self.uses_flow_fields():
+            return None
+        if not target or not self.needs_path(target):
+            return None
+        return self.engine.flow_fields.hostiles_key(self.entity)
+
+    def in_range(self, target: Actor) -> bool:
+        # cops shoot whatever they can see
+        return self.engine.game_map.visible[self.entity.x, self.entity.y]
+
+    def attack(self, target: Actor) -> None:
+        return RangedAction(self.entity, (target.x, target.y)).perform()
+
     def perform(self) -> None:
-        target = self.get_closest_enemy()
+        target = self.take_target()
 
         if target:
-            dx = target.x - self.entity.x
-            dy = target.y - self.entity.y
-            # look up Chebyshev distance
-            distance = max(abs(dx), abs(dy))
+            self.plan_path(target)
+            if self.in_range(target):
+                return self.attack(target)
 
-            self.path = self.get_path_to(target.x, target.y)
-            if self.engine.game_map.visible[self.entity.x, self.entity.y]:
-                return RangedAction(self.entity, (target.x, target.y)).perform()
-
-            if self.path:
-                dest_x, dest_y = self.path.pop(0)
-                return MovementAction(
-                    self.entity,
-                    dest_x - self.entity.x,
-                    dest_y - self.entity.y,
-                ).perform()
+            if self.path_cache.path:
+                return self.follow_path()
 
         return WaitAction(self.entity).perform()
 
@@ -169,24 +312,37 @@ class MinerAI(BaseAI):
         super().__init__(entity)
         self.path: List[Tuple[int, int]] = []
 
+    def clone(self, entity: Actor) -> BaseAI:
+        clone = super().clone(entity)
+        clone.path = list(self.path)
+        return clone
+
     def get_closest_resource(self) -> Resource:
-        return self.entity.get_closest_entity(
-            [entity for entity in self.entity.gamemap.resources]
-        )
+        return self.entity.gamemap.get_closest_resource(self.entity)
 
     def get_closest_friendly_spawner(self) -> MobSpawner:
-        return self.entity.get_closest_entity(
-            [
-                entity
-                for entity in self.entity.gamemap.actors
-                if isinstance(entity, MobSpawner)
-                and entity.faction == self.entity.faction
-            ]
-        )
+        return self.entity.gamemap.get_closest_friendly_spawner(self.entity)
+
+    def can_harvest(self) -> bool:
+        return len(self.entity.inventory.items) < self.entity.inventory.capacity
+
+    def find_target(self) -> Optional[Entity]:
+        # a resource while there's room to carry, else somewhere to drop it off
+        if self.can_harvest():
+            return self.get_closest_resource()
+        return self.get_closest_friendly_spawner()
+
+    def path_request(self, target: Optional[Entity]) -> Optional[Hashable]:
+        if not self.engine.game_map.visible[self.entity.x, self.entity.y]:
+            return None
+        if not target or self.get_distance(target.x, target.y) <= 1:
+            return None
+        if self.can_harvest():
+            return self.engine.flow_fields.resources_key(self.entity)
+        return self.engine.flow_fields.spawners_key(self.entity)
 
     # pathing to target and executing action if in range and movement otherwise could be its own function.
-    def seek_resource(self) -> None:
-        target = self.get_closest_resource()
+    def seek_resource(self, target: Optional[Resource]) -> None:
         if target:
             dx = target.x - self.entity.x
             dy = target.y - self.entity.y
@@ -196,7 +352,7 @@ class MinerAI(BaseAI):
                 if distance <= 1:
                     return MineAction(self.entity, dx, dy).perform()
 
-                self.path = self.get_path_to(target.x, target.y)
+                self.path = self.engine.flow_fields.path_to_resources(self.entity)
 
             if self.path:
                 dest_x, dest_y = self.path.pop(0)
@@ -206,8 +362,7 @@ class MinerAI(BaseAI):
                     dest_y - self.entity.y,
                 ).perform()
 
-    def seek_spawner(self) -> None:
-        target = self.get_closest_friendly_spawner()
+    def seek_spawner(self, target: Optional[MobSpawner]) -> None:
         if target:
             dx = target.x - self.entity.x
             dy = target.y - self.entity.y
@@ -217,7 +372,7 @@ class MinerAI(BaseAI):
                 if distance <= 1:
                     return DepositAction(self.entity, dx, dy).perform()
 
-                self.path = self.get_path_to(target.x, target.y)
+                self.path = self.engine.flow_fields.path_to_spawners(self.entity)
 
             if self.path:
                 dest_x, dest_y = self.path.pop(0)
@@ -227,11 +382,31 @@ class MinerAI(BaseAI):
                     dest_y - self.entity.y,
                 ).perform()
 
+    def perform_degraded(self) -> None:
+        # no pathing, but still mine or deposit when right next to the target
+        if self.engine.game_map.visible[self.entity.x, self.entity.y]:
+            target = self.take_target()
+            action = MineAction if self.can_harvest() else DepositAction
+            if target and self.get_distance(target.x, target.y) <= 1:
+                return action(
+                    self.entity, target.x - self.entity.x, target.y - self.entity.y
+                ).perform()
+        if self.path and next_step_open(
+            self.engine.game_map, self.path, self.entity.x, self.entity.y
+        ):
+            dest_x, dest_y = self.path.pop(0)
+            return MovementAction(
+                self.entity,
+                dest_x - self.entity.x,
+                dest_y - self.entity.y,
+            ).perform()
+        return WaitAction(self.entity).perform()
+
     def perform(self) -> None:
-        can_harvest = len(self.entity.inventory.items) < self.entity.inventory.capacity
+        target = self.take_target()
 
-        if can_harvest:
-            self.seek_resource()
+        if self.can_harvest():
+            self.seek_resource(target)
             # dx = target.x - self.entity.x
             # dy = target.y - self.entity.y
             # distance = max(abs(dx), abs(dy))
@@ -248,7 +423,7 @@ class MinerAI(BaseAI):
             #     self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
             #   ).perform()
         else:
-            self.seek_spawner()
+            self.seek_spawner(target)
 
         return WaitAction(self.entity).perform()
 
@@ -262,10 +437,12 @@ class EcoSpawnerAI(BaseAI):
 
 
 class TimerSpawnerAI(BaseAI):
+    # spawns come from TimerSpawner's timer event, nothing to do per turn
+    takes_turns = False
+
     def __init__(self, entity: MobSpawner):
         super().__init__(entity)
 
     def perform(self) -> None:
-        self.entity.spawner.decrement_timer()
         return WaitAction(self.entity).perform()
 
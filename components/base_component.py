@@ -1,16 +1,30 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import copy
+from typing import List, TYPE_CHECKING
 
 if TYPE_CHECKING:
   from engine import Engine
   from entity import Entity
   from game_map import GameMap
 
+def state_names(obj) -> List[str]:
+  # every attribute an instance carries, whether it lives in __slots__ or
+  # in __dict__ (subclasses without __slots__ still get a __dict__)
+  names = []
+  for klass in type(obj).__mro__:
+    for name in getattr(klass, "__slots__", ()):
+      if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+        names.append(name)
+  names.extend(getattr(obj, "__dict__", ()))
+  return names
+
 class BaseComponent:
   # entity: Entity
   parent: Entity
 
+  __slots__ = ("parent",)
+
   @property
   def gamemap(self) -> GameMap:
     return self.parent.gamemap
@@ -18,4 +32,19 @@ class BaseComponent:
   @property
   def engine(self) -> Engine:
     # return self.entity.gamemap.engine
-    return self.gamemap.engine
\ No newline at end of file
+    return self.gamemap.engine
+
+  def clone(self):
+    # used by Entity.clone when spawning from a prototype. a shallow copy is
+    # enough for components that only hold numbers/strings or shared
+    # prototype objects; components with mutable state override this.
+    # the caller sets .parent on the copy
+    return copy.copy(self)
+
+  def reset_from(self, prototype: BaseComponent) -> None:
+    # pooled entities reuse their component objects: take on the
+    # prototype's state but keep our own parent
+    parent = self.parent
+    for name in state_names(prototype):
+      setattr(self, name, getattr(prototype, name))
+    self.parent = parent
@@ -36,6 +36,7 @@ class Consumable(BaseComponent):
             entity.amount -= 1
             if entity.amount == 0:
                 inventory.items.remove(entity)
+                entity.recycle()
 
 
 # superfluous
@@ -146,15 +147,16 @@ class LightningDamageConsumable(Consumable):
     def activate(self, action: actions.ItemAction) -> None:
         consumer = action.entity
         target = None
-        closest_distance = self.maximum_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.gamemap.visible[actor.x, actor.y]:
-                distance = consumer.distance(actor.x, actor.y)
-
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+        store = self.engine.game_map.store
+
+        # every visible living actor except the consumer, closest first
+        candidates = store.visible_ids(self.engine.game_map.visible, store.alive_ids())
+        candidates = candidates[candidates != consumer.store_id]
+        if len(candidates):
+            distances = store.distances_from(consumer.x, consumer.y, candidates)
+            closest = distances.argmin()
+            if distances[closest] < self.maximum_range + 1.0:
+                target = store.entities[candidates[closest]]
 
         if target:
             self.engine.message_log.add_message(
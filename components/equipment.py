@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, TYPE_CHECKING
 
 from components.base_component import BaseComponent
 from equipment_types import EquipmentType
@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 class Equipment(BaseComponent):
     parent: Actor
 
+    __slots__ = ("weapon", "armor", "ranged")
+
     def __init__(
         self,
         weapon: Optional[Item] = None,
@@ -22,6 +24,23 @@ class Equipment(BaseComponent):
         self.armor = armor
         self.ranged = ranged
 
+    def clone(self, item_copies: Dict[int, Item]) -> Equipment:
+        # items that also sit in the inventory get their copies, anything else
+        # (e.g. poison fangs) is only ever read so it stays shared
+        clone = super().clone()
+        for slot in ("weapon", "armor", "ranged"):
+            item = getattr(self, slot)
+            if item is not None:
+                setattr(clone, slot, item_copies.get(id(item), item))
+        return clone
+
+    def reset_from(self, prototype: Equipment, item_copies: Dict[int, Item]) -> None:
+        super().reset_from(prototype)
+        for slot in ("weapon", "armor", "ranged"):
+            item = getattr(prototype, slot)
+            if item is not None:
+                setattr(self, slot, item_copies.get(id(item), item))
+
     @property
     def armor_bonus(self) -> int:
         bonus = 0
@@ -11,13 +11,23 @@ from render_order import RenderOrder
 if TYPE_CHECKING:
     from entity import Actor
     from components.equipment import Weapon
-    # from condition import Condition
+    from condition import Condition
 
 
 class Fighter(BaseComponent):
     # entity: Actor
     parent: Actor
 
+    __slots__ = (
+        "max_hp",
+        "_hp",
+        "base_armor",
+        "base_dodge",
+        "base_accuracy",
+        "natural_weapon",
+        "conditions",
+    )
+
     def __init__(
         self,
         hp: int,
@@ -36,13 +46,40 @@ class Fighter(BaseComponent):
         self.conditions = {}  # switched from list to dict for better condition lookup
         # self.attack_effect = attack_effect
 
+    def clone(self) -> Fighter:
+        # natural_weapon is shared with the prototype, it's never mutated
+        clone = super().clone()
+        clone.conditions = {}
+        for name, condition in self.conditions.items():
+            clone.conditions[name] = condition.clone() if condition else condition
+        return clone
+
+    def reset_from(self, prototype: Fighter) -> None:
+        super().reset_from(prototype)
+        self.conditions = {}
+        for name, condition in prototype.conditions.items():
+            self.conditions[name] = condition.clone() if condition else condition
+
+    def add_condition(self, condition: Condition) -> None:
+        # attach and start ticking once per turn, see Condition.tick
+        self.conditions[condition.name] = condition
+        condition.parent = self.parent
+        engine = self.engine
+        condition.on_attach(engine.rng.combat)
+        engine.timers.schedule(engine.turn + 1, condition.tick)
+
     @property
     def hp(self) -> int:
         return self._hp
 
     @hp.setter
     def hp(self, value: int) -> None:
+        hurt = value < self._hp
         self._hp = max(0, min(value, self.max_hp))
+        if self.parent.store_id is not None:
+            self.gamemap.store.hp[self.parent.store_id] = self._hp
+            if hurt:
+                self.gamemap.wake(self.parent)
         if self._hp == 0 and self.parent.ai:
             self.die()
 
@@ -83,10 +120,12 @@ class Fighter(BaseComponent):
         if self.engine.player is self.parent:
             death_message = "You died!\nPress 'r' to try again."
             death_message_color = color.player_die
+            death_args = ()
             # self.engine.event_handler = GameOverEventHandler(self.engine)
         else:
-            death_message = f"{self.parent.name} is dead!"
+            death_message = "%s is dead!"
             death_message_color = color.enemy_die
+            death_args = (self.parent.name,)
 
         self.parent.char = "%"
         self.parent.color = (191, 0, 0)
@@ -94,9 +133,12 @@ class Fighter(BaseComponent):
         self.parent.ai = None
         self.parent.name = f"remains of {self.parent.name}"
         self.parent.render_order = RenderOrder.CORPSE
+        self.gamemap.actor_died(self.parent)
 
         # print(death_message)
-        self.engine.message_log.add_message(death_message, death_message_color)
+        self.engine.message_log.add_message(
+            death_message, death_message_color, *death_args
+        )
         """
     disabled XP for now, currently it goes to the player no matter who kills it,
     which is no good. I also just don't know if i want XP in the game.
@@ -27,7 +27,7 @@ class Harvestable(BaseComponent):
   def decrement(self) -> None:
     self.capacity -= self.portion
     if self.capacity <= 0:
-      self.parent.gamemap.entities.remove(self.parent)
+      self.parent.recycle()
 
 #this might be totally useless rn?
 class Crystal(Harvestable):
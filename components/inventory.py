@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, TYPE_CHECKING
 
 from components.base_component import BaseComponent
 
@@ -11,10 +11,27 @@ if TYPE_CHECKING:
 class Inventory(BaseComponent):
     parent: Actor
 
+    __slots__ = ("capacity", "items")
+
     def __init__(self, capacity: int, items: List = []):
         self.capacity = capacity
         self.items: List[Item] = items
 
+    def clone(self, item_copies: Dict[int, Item]) -> Inventory:
+        # item_copies maps id(original item) -> its copy, built by Actor.clone
+        # so equipment slots can point at the same copies
+        clone = super().clone()
+        clone.items = [item_copies[id(item)] for item in self.items]
+        for item in clone.items:
+            item.parent = clone
+        return clone
+
+    def reset_from(self, prototype: Inventory, item_copies: Dict[int, Item]) -> None:
+        super().reset_from(prototype)
+        self.items = [item_copies[id(item)] for item in prototype.items]
+        for item in self.items:
+            item.parent = self
+
     def drop(self, item: Item) -> None:
         self.items.remove(item)
         item.place(self.parent.x, self.parent.y, self.gamemap)
@@ -21,9 +21,13 @@ class Spawner(BaseComponent):
 
   def spawn_mob(self) -> None:
     dungeon = self.parent.parent
-    if not any(entity is not self.parent and entity.x == self.parent.x and entity.y == self.parent.y for entity in dungeon.entities):
+    if not any(entity is not self.parent for entity in dungeon.get_entities_at_location(self.parent.x, self.parent.y)):
       self.mob.spawn(dungeon, self.parent.x, self.parent.y)
 
+  def on_placed(self) -> None:
+    # called by GameMap.add_entity
+    pass
+
 class TimerSpawner(Spawner):
   def __init__(
     self,
@@ -33,14 +37,35 @@ class TimerSpawner(Spawner):
     super().__init__(
       mob=mob,
     )
-    self.delay = self.timer = delay
+    self.delay = delay
+    # pending spawn on the engine's TimerQueue
+    self.timer_event = None
+
+  def clone(self) -> TimerSpawner:
+    clone = super().clone()
+    clone.timer_event = None
+    return clone
+
+  def reset_from(self, prototype: TimerSpawner) -> None:
+    super().reset_from(prototype)
+    self.timer_event = None
 
-  def decrement_timer(self) -> None:
-    self.timer -= 1
+  def on_placed(self) -> None:
+    # (re)arm the timer whenever we land on a map
+    engine = self.engine
+    if self.timer_event:
+      engine.timers.cancel(self.timer_event)
+    self.timer_event = engine.timers.schedule(engine.turn + self.delay, self.on_timer)
+
+  def on_timer(self) -> None:
+    self.timer_event = None
+    if not self.parent.is_alive or self.parent.store_id is None:
+      return  # destroyed or off the map since this was booked
+    if self.parent.gamemap is not self.engine.game_map:
+      return  # a floor the player has left, it stays quiet from now on
     # print(f'{self.parent.name} timer: {self.timer}')
-    if self.timer <= 0:
-      self.spawn_mob()
-      self.timer = self.delay
+    self.spawn_mob()
+    self.on_placed()
 
 class EcoSpawner(Spawner):
   def __init__(
@@ -1,5 +1,8 @@
+import copy
+from random import Random
 from typing import TYPE_CHECKING
-from random import randint
+
+import color
 
 if TYPE_CHECKING:
     from components.fighter import Fighter
@@ -8,6 +11,15 @@ if TYPE_CHECKING:
 class Condition:
     parent: None
 
+    __slots__ = (
+        "name",
+        "afflict_message",
+        "cure_message",
+        "_initial_duration",
+        "duration",
+        "parent",
+    )
+
     def __init__(
         self,
         name: str = "<Unnamed Condition>",
@@ -22,20 +34,54 @@ class Condition:
         self.duration = duration
         self.parent = None
 
+    def clone(self):
+        # the caller sets .parent on the copy
+        return copy.copy(self)
+
+    def on_attach(self, rng: Random):
+        # called by Fighter.add_condition, for anything rolled per affliction
+        pass
+
+    def is_attached(self) -> bool:
+        # cures can drop the whole conditions dict, so check we're still in it
+        return (
+            self.parent.is_alive
+            and self.parent.fighter.conditions.get(self.name) is self
+        )
+
+    def tick(self):
+        # timer event set up by Fighter.add_condition, procs once per turn and
+        # books the next tick for as long as the condition sticks around
+        if not self.is_attached():
+            return
+        engine = self.parent.parent.engine
+        if self.parent.parent is not engine.game_map:
+            # the player left this floor for good, stop ticking with it
+            return
+        self.proc()
+        if self.is_attached():
+            engine.timers.schedule(engine.turn + 1, self.tick)
+
     def proc(self):
         if self.duration:
             self.duration -= 1
             if self.duration < 1:
                 self.parent.parent.engine.message_log.add_message(
-                    self.parent.name + self.cure_message
+                    "%s%s", color.white, self.parent.name, self.cure_message
                 )
-                self.parent.fighter.conditions[self.name] = None
+                del self.parent.fighter.conditions[self.name]
+
+    @property
+    def rng(self) -> Random:
+        return self.parent.parent.engine.rng.combat
 
     def extend_condition(self):
-        self.duration += randint(1, self._initial_duration)
+        self.duration += self.rng.randint(1, self._initial_duration)
 
 
 class PoisonCondition(Condition):
+    __slots__ = ("damage_die", "damage")
+
     def __init__(
         self,
         name: str = "<Unnamed Poison>",
@@ -51,18 +97,24 @@ class PoisonCondition(Condition):
             duration=duration,
         )
         self.damage_die = damage_die
-        self.damage = randint(1, damage_die)
+        self.damage = 0  # rolled in on_attach
+
+    def on_attach(self, rng: Random):
+        self.damage = rng.randint(1, self.damage_die)
 
     def proc(self):
         self.parent.fighter.hp -= self.damage
         self.parent.parent.engine.message_log.add_message(
-            f"{self.parent.name} takes {self.damage} damage from poison.", (255, 0, 0)
+            "%s takes %d damage from poison.",
+            (255, 0, 0),
+            self.parent.name,
+            self.damage,
         )
         super().proc()
 
     def extend_condition(self):
         super().extend_condition()
-        self.damage += randint(1, self.damage_die)
+        self.damage += self.rng.randint(1, self.damage_die)
         self.parent.parent.engine.message_log.add_message(
-            f"{self.parent.name}'s {self.name} gets worse!"
+            "%s's %s gets worse!", color.white, self.parent.name, self.name
         )
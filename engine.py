@@ -4,15 +4,24 @@ from __future__ import annotations
 
 import lzma
 import pickle
+import time
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from tcod.context import Context
 from tcod.console import Console
 from tcod.map import compute_fov
 # from tcod import FOV_SYMMETRIC_SHADOWCAST
 
+import color
+from combat import CombatResolver
 import exceptions
+from flow_field import FlowFields
+from game_map import DORMANT_AFTER, WAKE_RADIUS
+from path_cache import PathCacheStats
+from procgen import summon_cops
+from rng import GameRandom
+from timers import TimerQueue
 
 # from input_handlers import MainGameEventHandler
 from message_log import MessageLog
@@ -20,18 +29,46 @@ import render_functions
 import entity_factories
 from entity import Entity
 
+# what a finished player turn led to, see Engine.check_outcome
+OUTCOME_DEAD = "dead"
+OUTCOME_LEVEL_UP = "level_up"
+OUTCOME_ARREST = "arrest"
+OUTCOME_VICTORY = "victory"
+# score at which the police show up
+POLICE_SCORE = 500
+# AI seconds per enemy turn in the windowed game, where a slow turn stalls
+# the UI. headless and batch runs leave the budget off to stay reproducible
+INTERACTIVE_AI_BUDGET = 0.05
+
 if TYPE_CHECKING:
     # from entity import Entity
+    from components.ai import BaseAI
     from entity import Actor
     from game_map import GameMap, GameWorld
     # from input_handlers import EventHandler
 
 
+class TurnStats:
+    """What the last enemy turn cost, for tuning Engine.ai_budget."""
+
+    def __init__(self) -> None:
+        self.actors = 0
+        self.degraded = 0  # actors that ran perform_degraded
+        self.elapsed = 0.0  # seconds
+        # over the whole game
+        self.actors_total = 0
+        self.degraded_total = 0
+
+    def reset(self) -> None:
+        self.actors = self.degraded = 0
+        self.elapsed = 0.0
+
+
 class Engine:
     game_map: GameMap
     game_world: GameWorld
 
-    def __init__(self, player: Actor):
+    def __init__(self, player: Actor, seed: Optional[int] = None):
         self.message_log = MessageLog()
         self.mouse_location: tuple[int, int] = (0, 0)
         self.player = player
@@ -51,25 +88,120 @@ class Engine:
         self.auto_wait = False
         self.score = 0
         self.police_called = False
+        self.police_score = POLICE_SCORE
+        # shared AI distance maps, rebuilt lazily every enemy turn
+        self.flow_fields = FlowFields(self)
+        self.path_cache_stats = PathCacheStats()
+        # seconds of AI thinking per enemy turn before everyone left falls back
+        # to cheap behaviour (perform_degraded). None for no limit. off by
+        # default: it's wall clock, so a budgeted game plays differently on a
+        # slow or busy machine and seeds stop being reproducible. the windowed
+        # game turns it on, see setup_game.MainMenu
+        self.ai_budget: Optional[float] = None
+        self.turn_stats = TurnStats()
+        # enemy turns played so far, the clock for timed events (condition
+        # ticks, spawn timers)
+        self.turn = 0
+        self.timers = TimerQueue()
+        self.combat = CombatResolver(self)
+        # every random roll of the game comes from here, same seed same game
+        self.rng = GameRandom(seed)
+
+    def end_player_turn(self) -> None:
+        # everything that happens once the player has successfully acted
+        self.handle_enemy_turns()
+        self.update_fov()
+
+    def check_outcome(self) -> Optional[str]:
+        """
+        What the turn that just ended led to, one of the OUTCOME_ constants or
+        None to play on. Shared by the event handlers and headless runs.
+        """
+        if not self.player.is_alive:
+            if self.police_called:
+                self.message_log.add_message("JUSTICE IS SERVED", (0, 0, 255))
+            return OUTCOME_DEAD
+        if self.player.level.requires_level_up:
+            return OUTCOME_LEVEL_UP
+        if self.score >= self.police_score and not self.police_called:
+            self.message_log.add_message("A stern voice rings out over bullhorn:")
+            self.message_log.add_message(
+                '"Big Snake Hunter! We have you surrounded! Come out with your hands up!"',
+                color.enemy_atk,
+            )
+            self.police_called = True
+            return OUTCOME_ARREST
+        if self.police_called and len(self.game_map.actors) == 1:
+            return OUTCOME_VICTORY
+        return None
+
+    def resist_arrest(self) -> None:
+        self.message_log.add_message("Then pay with your blood!", (0, 0, 255))
+        summon_cops(self.game_map, 10)
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            # print(f'The {entity.name} does nothing on its turn :P')
-            if entity.ai:
-                condition_removal = []
-                for condition in entity.fighter.conditions:
-                    if entity.fighter.conditions[condition] is not None:
-                        entity.fighter.conditions[
-                            condition
-                        ].proc()  # if poisoned, take damage for instance
-                    else:
-                        condition_removal.append(condition)
-                for condition in condition_removal:
-                    entity.fighter.conditions.pop(condition)
-                try:
-                    entity.ai.perform()
-                except exceptions.Impossible:
-                    pass  # plays dont need to know every time AI fails attempt
+        started = time.perf_counter()
+        stats = self.turn_stats
+        stats.reset()
+        self.turn += 1
+        for callback in self.timers.pop_due(self.turn):
+            callback()
+        self.flow_fields.clear()
+        scheduler = self.game_map.scheduler
+        # phase one: find everyone's target, work out who needs a fresh path
+        # and build each distinct flow field once. phase two: everyone acts,
+        # reading the shared fields and reusing the target found here
+        requests = []
+        for entity in scheduler.due():
+            ai = entity.ai
+            if ai:
+                ai.target = ai.find_target()
+                requests.append(ai.path_request(ai.target))
+        self.flow_fields.prepare(requests)
+        # an actor's attacks get rolled together once its action is done, and
+        # land before the next actor moves, same order as resolving each one
+        # on the spot
+        self.combat.batching = True
+        try:
+            for entity in scheduler.run_turn():
+                # print(f'The {entity.name} does nothing on its turn :P')
+                if entity.ai:
+                    stats.actors += 1
+                    over_budget = (
+                        self.ai_budget is not None
+                        and time.perf_counter() - started > self.ai_budget
+                    )
+                    ai = entity.ai
+                    ai.waited = False
+                    try:
+                        if over_budget:
+                            stats.degraded += 1
+                            ai.perform_degraded()
+                        else:
+                            ai.perform()
+                    except exceptions.Impossible:
+                        pass  # plays dont need to know every time AI fails attempt
+                    finally:
+                        self.combat.flush()
+                    self.update_dormancy(entity, ai)
+        finally:
+            self.combat.batching = False
+            self.combat.flush()
+        stats.actors_total += stats.actors
+        stats.degraded_total += stats.degraded
+        stats.elapsed = time.perf_counter() - started
+
+    def update_dormancy(self, entity: Actor, ai: BaseAI) -> None:
+        # idle for a while with nobody hostile around: stop running it
+        if not ai.can_sleep or entity.ai is not ai:
+            return
+        ai.idle_turns = ai.idle_turns + 1 if ai.waited else 0
+        if (
+            ai.idle_turns >= DORMANT_AFTER
+            and not entity.fighter.conditions
+            and not self.game_map.hostile_near(entity, WAKE_RADIUS)
+        ):
+            self.game_map.sleep(entity)
 
     def update_fov(self) -> None:
         fov_radius = 8 if self.do_fov else 0
@@ -106,6 +238,9 @@ class Engine:
         render_functions.render_names_at_mouse_location(
             console=console, x=51, y=8, engine=self
         )
+        render_functions.render_attack_odds_at_mouse_location(
+            console=console, x=51, y=7, engine=self
+        )
 
     def save_as(self, filename: str) -> None:
         # data = {
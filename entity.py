@@ -4,7 +4,9 @@ import copy
 import math
 from typing import Optional, Tuple, Type, List, TypeVar, TYPE_CHECKING, Union
 
+import entity_pool
 from render_order import RenderOrder
+from scheduler import NORMAL_SPEED
 
 if TYPE_CHECKING:
     from components.ai import BaseAI, SpawnerAI
@@ -26,6 +28,21 @@ class Entity:
     A generic object to represent players, enemies, items, etc.
     """
 
+    # slots instead of a per-instance __dict__, corpses never leave the map
+    # so there can be a lot of these around
+    __slots__ = (
+        "parent",
+        "store_id",
+        "pool_name",
+        "x",
+        "y",
+        "char",
+        "color",
+        "name",
+        "_blocks_movement",
+        "_render_order",
+    )
+
     parent: Union[GameMap, Inventory]
 
     def __init__(
@@ -39,6 +56,8 @@ class Entity:
         blocks_movement: bool = False,
         render_order: RenderOrder = RenderOrder.CORPSE,
     ):
+        self.store_id: Optional[int] = None  # slot in GameMap.store while on a map
+        self.pool_name: Optional[str] = None  # set on entity_factories prototypes
         self.x = x
         self.y = y
         self.char = char
@@ -47,33 +66,93 @@ class Entity:
         self.blocks_movement = blocks_movement
         self.render_order = render_order
         if parent:  # if it comes with a gamemap, add it
-            self.gamemap = parent
-            parent.entities.add(self)
+            self.parent = parent
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
+    # these two are mirrored into GameMap.store, so writes go through setters
+    @property
+    def blocks_movement(self) -> bool:
+        return self._blocks_movement
+
+    @blocks_movement.setter
+    def blocks_movement(self, value: bool) -> None:
+        changed = self.store_id is not None and value != self._blocks_movement
+        self._blocks_movement = value
+        if changed:
+            self.parent.blocking_changed(self)
+
+    @property
+    def render_order(self) -> RenderOrder:
+        return self._render_order
+
+    @render_order.setter
+    def render_order(self, value: RenderOrder) -> None:
+        self._render_order = value
+        if self.store_id is not None:
+            self.parent.store.render_order[self.store_id] = value.value
+
+    def clone(self: T) -> T:
+        """
+        Copy this entity for spawning. Only per-instance state gets copied,
+        parts that are never mutated (natural weapons, spawner mobs, ...)
+        stay shared with the prototype. Subclasses copy their components.
+        """
+        clone = copy.copy(self)
+        clone.store_id = None
+        if hasattr(clone, "parent"):
+            del clone.parent
+        return clone
+
+    def reset_from(self, prototype: Entity) -> None:
+        # pooled entities get overwritten with the prototype's state instead
+        # of being cloned again. the entity is off-map at this point
+        self.char = prototype.char
+        self.color = prototype.color
+        self.name = prototype.name
+        self.blocks_movement = prototype.blocks_movement
+        self.render_order = prototype.render_order
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
-        clone = copy.deepcopy(self)
+        pool = entity_pool.pool_for(self)
+        if pool and pool.prototype is self:
+            clone = pool.acquire()
+        else:
+            clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
 
+    def recycle(self) -> None:
+        # take the entity out of play for good and hand it back to its
+        # prototype's pool. nothing should hold on to it afterwards
+        if self.store_id is not None:
+            self.gamemap.remove_entity(self)
+        if hasattr(self, "parent"):
+            del self.parent
+        pool = entity_pool.pool_for(self)
+        if pool and pool.prototype is not self:
+            pool.release(self)
+
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         # move entity from one place to another, potentially
         # across gamemaps
-        self.x = x
-        self.y = y
         if gamemap:
             if hasattr(self, "parent"):
                 if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
+                    self.gamemap.remove_entity(self)
                     # if its already on a map, remove it
+            self.x = x
+            self.y = y
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        else:
+            self.gamemap.move_entity(self, x, y)
 
     def distance(self, x: int, y: int) -> float:
         return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2)
@@ -95,8 +174,7 @@ class Entity:
         return closest_entity
 
     def move(self, dx: int, dy: int) -> None:
-        self.x += dx
-        self.y += dy
+        self.gamemap.move_entity(self, self.x + dx, self.y + dy)
 
     def get_name(
         self,
@@ -105,6 +183,16 @@ class Entity:
 
 
 class Actor(Entity):
+    __slots__ = (
+        "ai",
+        "equipment",
+        "fighter",
+        "inventory",
+        "level",
+        "faction",
+        "speed",
+    )
+
     def __init__(
         self,
         *,
@@ -121,6 +209,7 @@ class Actor(Entity):
         inventory: Inventory,
         level: Level,
         faction: str,
+        speed: int = NORMAL_SPEED,
     ):
         super().__init__(
             x=x,
@@ -148,7 +237,57 @@ class Actor(Entity):
         self.level = level
         self.level.parent = self
 
-        self.faction = Optional[faction]
+        self.faction = faction
+        # actions per TURN_TIME, relative to NORMAL_SPEED
+        self.speed = speed
+
+    def clone(self: Actor) -> Actor:
+        clone = super().clone()
+
+        # copy inventory items once so equipment slots end up pointing at
+        # the same copies the inventory holds
+        item_copies = {}
+        if self.inventory:
+            for item in self.inventory.items:
+                item_copies[id(item)] = item.clone()
+            clone.inventory = self.inventory.clone(item_copies)
+            clone.inventory.parent = clone
+        if self.equipment:
+            clone.equipment = self.equipment.clone(item_copies)
+            clone.equipment.parent = clone
+
+        clone.fighter = self.fighter.clone()
+        clone.fighter.parent = clone
+        for condition in clone.fighter.conditions.values():
+            if condition:
+                condition.parent = clone
+
+        clone.level = self.level.clone()
+        clone.level.parent = clone
+
+        clone.ai = self.ai.clone(clone) if self.ai else None
+        return clone
+
+    def reset_from(self, prototype: Actor) -> None:
+        super().reset_from(prototype)
+        self.faction = prototype.faction
+        self.speed = prototype.speed
+
+        item_copies = {}
+        if prototype.inventory:
+            for item in prototype.inventory.items:
+                item_copies[id(item)] = item.clone()
+            self.inventory.reset_from(prototype.inventory, item_copies)
+        if prototype.equipment:
+            self.equipment.reset_from(prototype.equipment, item_copies)
+
+        self.fighter.reset_from(prototype.fighter)
+        for condition in self.fighter.conditions.values():
+            if condition:
+                condition.parent = self
+        self.level.reset_from(prototype.level)
+
+        self.ai = prototype.ai.clone(self) if prototype.ai else None
 
     @property
     def is_alive(self) -> bool:
@@ -162,6 +301,8 @@ class Actor(Entity):
 
 
 class MobSpawner(Actor):
+    __slots__ = ("spawner",)
+
     def __init__(
         self,
         *,
@@ -198,8 +339,20 @@ class MobSpawner(Actor):
         self.spawner: Optional[Spawner] = spawner
         self.spawner.parent = self
 
+    def clone(self: MobSpawner) -> MobSpawner:
+        clone = super().clone()
+        clone.spawner = self.spawner.clone()
+        clone.spawner.parent = clone
+        return clone
+
+    def reset_from(self, prototype: MobSpawner) -> None:
+        super().reset_from(prototype)
+        self.spawner.reset_from(prototype.spawner)
+
 
 class Item(Entity):
+    __slots__ = ("consumable", "equippable", "max_stack", "amount")
+
     def __init__(
         self,
         *,
@@ -236,6 +389,28 @@ class Item(Entity):
         if self.equippable:
             self.equippable.parent = self
 
+    def clone(self: Item) -> Item:
+        clone = super().clone()
+        if self.consumable:
+            clone.consumable = self.consumable.clone()
+            clone.consumable.parent = clone
+        if self.equippable:
+            clone.equippable = self.equippable.clone()
+            clone.equippable.parent = clone
+        return clone
+
+    def reset_from(self, prototype: Item) -> None:
+        super().reset_from(prototype)
+        self.max_stack = prototype.max_stack
+        self.amount = prototype.amount
+        self.consumable = self.equippable = None
+        if prototype.consumable:
+            self.consumable = prototype.consumable.clone()
+            self.consumable.parent = self
+        if prototype.equippable:
+            self.equippable = prototype.equippable.clone()
+            self.equippable.parent = self
+
     def get_name(self) -> str:
         if self.max_stack > 1:
             return f"{self.name} [{self.amount}]"
@@ -282,6 +457,8 @@ class Item(Entity):
 
 class Resource(Entity):
     # resources can be gathered here by workers
+    __slots__ = ("harvestable",)
+
     def __init__(
         self,
         *,
@@ -305,5 +482,15 @@ class Resource(Entity):
         self.harvestable = harvestable
         self.harvestable.parent = self
 
+    def clone(self: Resource) -> Resource:
+        clone = super().clone()
+        clone.harvestable = self.harvestable.clone()
+        clone.harvestable.parent = clone
+        return clone
+
+    def reset_from(self, prototype: Resource) -> None:
+        super().reset_from(prototype)
+        self.harvestable.reset_from(prototype.harvestable)
+
     def get_name(self) -> str:
         return f"{self.name} [{self.harvestable.capacity}]"
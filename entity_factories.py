@@ -9,6 +9,7 @@ from components.inventory import Inventory
 from components.level import Level
 from components.spawner import TimerSpawner, EcoSpawner
 from entity import Actor, Item, MobSpawner, Resource
+import entity_pool
 from color import guard_pink, virus_teal, snake_green
 from condition import PoisonCondition
 
@@ -188,6 +189,23 @@ beef_snake = Actor(
     level=Level(xp_given=1),
     faction="snake",
 )
+# recycling pools, Entity.spawn draws from them. add new prototypes here
+entity_pool.register_prototypes(
+    {
+        "fist": fist,
+        "player": player,
+        "combat_knife": combat_knife,
+        "ballistic_vest": ballistic_vest,
+        "medkit": medkit,
+        "poison_fangs": poison_fangs,
+        "glock": glock,
+        "scales": scales,
+        "cop": cop,
+        "snake": snake,
+        "beef_snake": beef_snake,
+    }
+)
+
 ###########################################################
 # OLD SHIT
 # allied mobs
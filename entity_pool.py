@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+DEFAULT_MAX_SIZE = 256
+
+
+class EntityPool:
+    """
+    Recycled copies of one prototype. Entity.spawn draws from here and
+    Entity.recycle puts entities back, so spawner battles and police waves
+    reuse Actor/component objects instead of allocating new ones.
+    """
+
+    def __init__(self, prototype: Entity, max_size: int = DEFAULT_MAX_SIZE):
+        self.prototype = prototype
+        self.max_size = max_size
+        self.free: List[Entity] = []
+        self.reused = 0
+        self.created = 0
+
+    def acquire(self) -> Entity:
+        if self.free:
+            entity = self.free.pop()
+            entity.reset_from(self.prototype)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.prototype.clone()
+
+    def release(self, entity: Entity) -> None:
+        # anything past max_size is left to the garbage collector
+        if len(self.free) < self.max_size:
+            self.free.append(entity)
+
+
+# prototype name (as in entity_factories) -> pool
+pools: Dict[str, EntityPool] = {}
+
+
+def register_prototypes(prototypes: Dict[str, Entity]) -> None:
+    for name, prototype in prototypes.items():
+        prototype.pool_name = name
+        pools[name] = EntityPool(prototype)
+
+
+def pool_for(entity: Entity) -> Optional[EntityPool]:
+    return pools.get(entity.pool_name)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+NO_FACTION = -1
+
+
+class EntityStore:
+    """
+    Struct-of-arrays copy of the per-entity fields we want to query in bulk
+    (position, faction, hp, blocking, render order, alive). Each entity on a
+    GameMap gets a slot id; the arrays are indexed by that id.
+
+    Entity and Fighter keep their plain attributes for single reads (a numpy
+    scalar read is slower than an attribute lookup) and write through to the
+    store whenever one of these fields changes, so the arrays are always
+    current for vectorized queries.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.faction = np.full(capacity, NO_FACTION, dtype=np.int16)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.blocks = np.zeros(capacity, dtype=bool)
+        self.render_order = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)  # alive actors only
+        self.in_use = np.zeros(capacity, dtype=bool)
+
+        self.entities: List[Optional[Entity]] = [None] * capacity
+        self.faction_ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._next_id = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.entities)
+
+    def _grow(self) -> None:
+        new_capacity = self.capacity * 2
+        for name in ("x", "y", "hp", "blocks", "render_order", "alive", "in_use"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        faction = np.full(new_capacity, NO_FACTION, dtype=np.int16)
+        faction[: len(self.faction)] = self.faction
+        self.faction = faction
+        self.entities.extend([None] * (new_capacity - len(self.entities)))
+
+    def faction_id(self, faction: Optional[str]) -> int:
+        if faction is None:
+            return NO_FACTION
+        if faction not in self.faction_ids:
+            self.faction_ids[faction] = len(self.faction_ids)
+        return self.faction_ids[faction]
+
+    def attach(self, entity: Entity) -> int:
+        if self._free:
+            store_id = self._free.pop()
+        else:
+            if self._next_id == self.capacity:
+                self._grow()
+            store_id = self._next_id
+            self._next_id += 1
+
+        entity.store_id = store_id
+        self.entities[store_id] = entity
+        self.in_use[store_id] = True
+        self.sync(entity)
+        return store_id
+
+    def detach(self, entity: Entity) -> None:
+        store_id = entity.store_id
+        entity.store_id = None
+        self.entities[store_id] = None
+        self.in_use[store_id] = False
+        self.alive[store_id] = False
+        self.faction[store_id] = NO_FACTION
+        self._free.append(store_id)
+
+    def sync(self, entity: Entity) -> None:
+        # copy every mirrored field over, used on attach
+        store_id = entity.store_id
+        self.x[store_id] = entity.x
+        self.y[store_id] = entity.y
+        self.blocks[store_id] = entity.blocks_movement
+        self.render_order[store_id] = entity.render_order.value
+        fighter = getattr(entity, "fighter", None)
+        self.hp[store_id] = fighter.hp if fighter else 0
+        self.alive[store_id] = bool(fighter) and entity.is_alive
+        self.faction[store_id] = self.faction_id(getattr(entity, "faction", None))
+
+    def set_position(self, entity: Entity) -> None:
+        self.x[entity.store_id] = entity.x
+        self.y[entity.store_id] = entity.y
+
+    # vectorized queries. these return store ids, map them back with
+    # self.entities[i]
+    def ids(self) -> np.ndarray:
+        return np.flatnonzero(self.in_use)
+
+    def alive_ids(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def visible_ids(self, visible: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        return ids[visible[self.x[ids], self.y[ids]]]
+
+    def distances_from(self, x: int, y: int, ids: np.ndarray) -> np.ndarray:
+        return np.hypot(self.x[ids] - x, self.y[ids] - y)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+import tcod
+
+from entity import MobSpawner
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Actor
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class FlowFields:
+    """
+    Dijkstra distance maps shared by every AI within a turn. Each map is rooted
+    at a whole target set ("every hostile of faction X", "every resource", ...)
+    so a turn costs one sweep over the map per target set instead of one
+    pathfinder per actor. Engine prepares the maps the AIs asked for up front;
+    anything not prepared is built the first time someone needs it. Actors
+    read their path off the map by walking downhill from where they stand.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.fields: Dict[Hashable, np.ndarray] = {}
+        self.sweeps = 0  # dijkstra runs since the last clear, for tuning
+
+    def clear(self) -> None:
+        # Engine calls this at the start of every enemy turn
+        self.fields.clear()
+        self.sweeps = 0
+
+    # keys for the target sets the AIs use
+    @staticmethod
+    def hostiles_key(actor: Actor) -> Hashable:
+        return ("hostiles", actor.faction)
+
+    @staticmethod
+    def resources_key(actor: Actor) -> Hashable:
+        return ("resources", None)
+
+    @staticmethod
+    def spawners_key(actor: Actor) -> Hashable:
+        return ("spawners", actor.faction)
+
+    def _roots(
+        self, keys: Iterable[Hashable]
+    ) -> Dict[Hashable, List[Tuple[int, int]]]:
+        # one pass over the actors covers every requested target set
+        game_map = self.engine.game_map
+        ghost = self.engine.player if self.engine.player_is_ghost else None
+        by_faction: Dict[str, List[Tuple[int, int]]] = {}
+        spawners_by_faction: Dict[str, List[Tuple[int, int]]] = {}
+        for actor in game_map.actors:
+            if actor is ghost:
+                continue
+            by_faction.setdefault(actor.faction, []).append((actor.x, actor.y))
+            if isinstance(actor, MobSpawner):
+                spawners_by_faction.setdefault(actor.faction, []).append(
+                    (actor.x, actor.y)
+                )
+
+        roots = {}
+        for kind, faction in keys:
+            if kind == "hostiles":
+                roots[kind, faction] = [
+                    position
+                    for other_faction, positions in by_faction.items()
+                    if other_faction != faction
+                    for position in positions
+                ]
+            elif kind == "spawners":
+                roots[kind, faction] = spawners_by_faction.get(faction, [])
+            elif kind == "resources":
+                roots[kind, faction] = [
+                    (resource.x, resource.y) for resource in game_map.resources
+                ]
+        return roots
+
+    def prepare(self, keys: Iterable[Optional[Hashable]]) -> None:
+        """
+        Build every requested map that isn't built yet, in one go. Engine
+        collects the keys from all AIs before anyone moves, so each target set
+        is swept exactly once however many actors want it.
+        """
+        wanted = [
+            key
+            for key in dict.fromkeys(keys)
+            if key is not None and key not in self.fields
+        ]
+        if not wanted:
+            return
+        cost = self.engine.game_map.path_cost
+        for key, roots in self._roots(wanted).items():
+            distance = np.full(cost.shape, UNREACHABLE, dtype=np.int32)
+            for x, y in roots:
+                distance[x, y] = 0
+            tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+            self.fields[key] = distance
+            self.sweeps += 1
+
+    def distance_map(self, key: Hashable) -> np.ndarray:
+        if key not in self.fields:
+            self.prepare([key])
+        return self.fields[key]
+
+    def path_from(self, key: Hashable, x: int, y: int) -> List[Tuple[int, int]]:
+        # path (excluding the start) to the closest root, empty if unreachable
+        distance = self.distance_map(key)
+        if distance[x, y] == UNREACHABLE:
+            return []
+        path = tcod.path.hillclimb2d(distance, (x, y), True, True)[1:].tolist()
+        return [(index[0], index[1]) for index in path]
+
+    def path_to_hostiles(self, actor: Actor) -> List[Tuple[int, int]]:
+        return self.path_from(self.hostiles_key(actor), actor.x, actor.y)
+
+    def path_to_resources(self, actor: Actor) -> List[Tuple[int, int]]:
+        return self.path_from(self.resources_key(actor), actor.x, actor.y)
+
+    def path_to_spawners(self, actor: Actor) -> List[Tuple[int, int]]:
+        return self.path_from(self.spawners_key(actor), actor.x, actor.y)
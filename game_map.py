@@ -1,16 +1,26 @@
 from __future__ import annotations
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import Dict, Iterable, KeysView, List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tcod.console import Console
 
-from entity import Actor, Item, Resource
+from entity import Actor, Item, MobSpawner, Resource
+from entity_store import EntityStore
+from hpa import HierarchicalMap, MIN_MAP_SIZE
+from proximity import ProximityGrid
+from scheduler import TurnScheduler
 import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
 
+# idle actors with no hostile this close go dormant, and anything hostile
+# coming this close wakes them again
+WAKE_RADIUS = 12
+# consecutive waits before an idle actor may go dormant
+DORMANT_AFTER = 3
+
 
 class GameMap:
     def __init__(
@@ -18,7 +28,38 @@ class GameMap:
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
+        self.entities = set()
+        # pathfinding costs: walls 0, floor 1, +10 per blocking entity. built
+        # on first use, then kept current by the entity methods below and
+        # set_tile, so write tiles through set_tile once the game is running
+        self._path_cost: Optional[np.ndarray] = None
+        # cluster abstraction for long paths on big maps, built on first use
+        self._hierarchy: Optional[HierarchicalMap] = None
+        # (x, y) -> entities on that tile, so location lookups don't have to
+        # scan every entity on the map. keep it in sync by going through
+        # add_entity/remove_entity/move_entity instead of touching
+        # self.entities or entity.x/y directly
+        self.entity_index: Dict[Tuple[int, int], List[Entity]] = {}
+        # live buckets by type, kept up to date as entities come, go and die.
+        # dicts instead of sets so iteration follows insertion order
+        self._actors: Dict[Actor, None] = {}
+        self._corpses: Dict[Actor, None] = {}
+        self._items: Dict[Item, None] = {}
+        self._resources: Dict[Resource, None] = {}
+        # once there are more corpses than this the oldest ones get recycled,
+        # None keeps them all
+        self.corpse_limit: Optional[int] = None
+        # numpy mirror of positions/factions/hp etc. for vectorized queries
+        self.store = EntityStore()
+        # living actors per faction, spawners per faction and resources, for
+        # nearest-whatever queries
+        self.proximity = ProximityGrid(width, height)
+        # living non-player actors in turn order, see Engine.handle_enemy_turns
+        self.scheduler = TurnScheduler()
+        # living actors taken out of the scheduler until something wakes them
+        self._dormant: Dict[Actor, None] = {}
+        for entity in entities:
+            entity.place(entity.x, entity.y, self)
         self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
 
         self.visible = np.full((width, height), fill_value=False, order="F")
@@ -30,31 +71,225 @@ class GameMap:
     def gamemap(self) -> GameMap:
         return self
 
+    # these are live views, copy them (list(), set()) before spawning or
+    # removing entities while iterating
     @property
-    def actors(self) -> Iterator[Actor]:
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+    def actors(self) -> KeysView[Actor]:
+        return self._actors.keys()
+
+    @property
+    def corpses(self) -> KeysView[Actor]:
+        return self._corpses.keys()
 
     @property
-    def items(self) -> Iterator[Item]:
-        yield from (entity for entity in self.entities if isinstance(entity, Item))
+    def items(self) -> KeysView[Item]:
+        return self._items.keys()
+
+    @property
+    def resources(self) -> KeysView[Resource]:
+        return self._resources.keys()
+
+    def _bucket_for(self, entity: Entity) -> Optional[Dict]:
+        if isinstance(entity, Actor):
+            return self._actors if entity.is_alive else self._corpses
+        if isinstance(entity, Item):
+            return self._items
+        if isinstance(entity, Resource):
+            return self._resources
+        return None
+
+    def _living_actor_groups(self, actor: Actor) -> Tuple:
+        groups: Tuple = (("faction", actor.faction),)
+        if isinstance(actor, MobSpawner):
+            groups += (("spawner", actor.faction),)
+        if actor in self._dormant:
+            groups += (("dormant", None),)
+        return groups
+
+    def _proximity_groups(self, entity: Entity) -> Tuple:
+        if isinstance(entity, Actor):
+            return self._living_actor_groups(entity) if entity.is_alive else ()
+        if isinstance(entity, Resource):
+            return (("resource", None),)
+        return ()
+
+    @property
+    def path_cost(self) -> np.ndarray:
+        # shared, don't modify it. SimpleGraph/dijkstra2d only read it
+        if self._path_cost is None:
+            cost = np.array(self.tiles["walkable"], dtype=np.int8)
+            for entity in self.entities:
+                if entity.blocks_movement and cost[entity.x, entity.y]:
+                    cost[entity.x, entity.y] += 10
+            self._path_cost = cost
+        return self._path_cost
+
+    @property
+    def hierarchy(self) -> Optional[HierarchicalMap]:
+        # None on maps small enough to path over the full grid
+        if max(self.width, self.height) < MIN_MAP_SIZE:
+            return None
+        if self._hierarchy is None:
+            self._hierarchy = HierarchicalMap(self)
+        return self._hierarchy
+
+    def _adjust_path_cost(self, x: int, y: int, delta: int) -> None:
+        if self._path_cost is not None and self._path_cost[x, y]:
+            self._path_cost[x, y] += delta
+
+    def set_tile(self, x: int, y: int, tile: np.ndarray) -> None:
+        self.tiles[x, y] = tile
+        if self._hierarchy is not None:
+            self._hierarchy.invalidate(x, y)
+        if self._path_cost is not None:
+            if tile["walkable"]:
+                blockers = sum(
+                    entity.blocks_movement
+                    for entity in self.get_entities_at_location(x, y)
+                )
+                self._path_cost[x, y] = 1 + 10 * blockers
+            else:
+                self._path_cost[x, y] = 0
+
+    def blocking_changed(self, entity: Entity) -> None:
+        # called by the Entity.blocks_movement setter
+        self.store.blocks[entity.store_id] = entity.blocks_movement
+        self._adjust_path_cost(entity.x, entity.y, 10 if entity.blocks_movement else -10)
+
+    def add_entity(self, entity: Entity) -> None:
+        self.entities.add(entity)
+        self.entity_index.setdefault((entity.x, entity.y), []).append(entity)
+        bucket = self._bucket_for(entity)
+        if bucket is not None:
+            bucket[entity] = None
+        self.store.attach(entity)
+        for group in self._proximity_groups(entity):
+            self.proximity.insert(group, entity)
+        if entity.blocks_movement:
+            self._adjust_path_cost(entity.x, entity.y, 10)
+        if bucket is self._actors:
+            if entity is not self.engine.player and entity.ai.takes_turns:
+                self.scheduler.add(entity)
+            if isinstance(entity, MobSpawner):
+                entity.spawner.on_placed()
+        if bucket is self._actors and self._dormant:
+            self._wake_near(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        self.scheduler.remove(entity)
+        for group in self._proximity_groups(entity):
+            self.proximity.remove(group, entity)
+        self._dormant.pop(entity, None)
+        self.entities.remove(entity)
+        self._unindex(entity)
+        bucket = self._bucket_for(entity)
+        if bucket is not None:
+            bucket.pop(entity, None)
+        self.store.detach(entity)
+        if entity.blocks_movement:
+            self._adjust_path_cost(entity.x, entity.y, -10)
+
+    def actor_died(self, actor: Actor) -> None:
+        # called by Fighter.die once the actor has turned into a corpse
+        if actor in self._actors:
+            for group in self._living_actor_groups(actor):
+                self.proximity.remove(group, actor)
+            self._dormant.pop(actor, None)
+            del self._actors[actor]
+            self.scheduler.remove(actor)
+            self._corpses[actor] = None
+            self.store.alive[actor.store_id] = False
+            if self.corpse_limit is not None:
+                self._trim_corpses()
+
+    def _trim_corpses(self) -> None:
+        # corpses are in order of death, so the first ones are the oldest
+        for corpse in list(self._corpses)[: len(self._corpses) - self.corpse_limit]:
+            if corpse is not self.engine.player:
+                corpse.recycle()
+
+    def move_entity(self, entity: Entity, x: int, y: int) -> None:
+        self._unindex(entity)
+        for group in self._proximity_groups(entity):
+            self.proximity.move(group, entity, x, y)
+        if entity.blocks_movement:
+            self._adjust_path_cost(entity.x, entity.y, -10)
+            self._adjust_path_cost(x, y, 10)
+        entity.x = x
+        entity.y = y
+        self.entity_index.setdefault((x, y), []).append(entity)
+        self.store.set_position(entity)
+        if self._dormant and entity in self._actors:
+            self._wake_near(entity)
 
     @property
-    def resources(self) -> Iterator[Resource]:
-        yield from (entity for entity in self.entities if isinstance(entity, Resource))
+    def dormant(self) -> KeysView[Actor]:
+        return self._dormant.keys()
+
+    def _hostile_groups(self, actor: Actor) -> List[Tuple]:
+        return [
+            group
+            for group in self.proximity.groups
+            if group[0] == "faction" and group[1] != actor.faction
+        ]
+
+    def hostile_near(self, actor: Actor, radius: int) -> bool:
+        ghosts = self._ghosts(actor)
+        return any(
+            hostile not in ghosts
+            for hostile in self.proximity.within(
+                actor.x, actor.y, radius, self._hostile_groups(actor)
+            )
+        )
+
+    def sleep(self, actor: Actor) -> None:
+        # stop running this actor's AI until wake() is called
+        if actor in self._dormant or actor not in self.scheduler:
+            return
+        self.scheduler.remove(actor)
+        self._dormant[actor] = None
+        self.proximity.insert(("dormant", None), actor)
+
+    def wake(self, actor: Actor) -> None:
+        if actor not in self._dormant:
+            return
+        self.proximity.remove(("dormant", None), actor)
+        del self._dormant[actor]
+        actor.ai.idle_turns = 0
+        self.scheduler.add(actor)
+
+    def _wake_near(self, actor: Actor) -> None:
+        # actor just showed up or moved, wake sleeping hostiles that can see it
+        if self.engine.player_is_ghost and actor is self.engine.player:
+            return
+        for sleeper in list(
+            self.proximity.within(actor.x, actor.y, WAKE_RADIUS, [("dormant", None)])
+        ):
+            if sleeper.faction != actor.faction:
+                self.wake(sleeper)
+
+    def make_noise(self, x: int, y: int, radius: int) -> None:
+        # fighting and the like wakes every sleeper in earshot, any faction
+        if self._dormant:
+            sleepers = self.proximity.within(x, y, radius, [("dormant", None)])
+            for sleeper in list(sleepers):
+                self.wake(sleeper)
+
+    def _unindex(self, entity: Entity) -> None:
+        location = (entity.x, entity.y)
+        on_tile = self.entity_index[location]
+        on_tile.remove(entity)
+        if not on_tile:
+            del self.entity_index[location]
+
+    def get_entities_at_location(self, x: int, y: int) -> List[Entity]:
+        return self.entity_index.get((x, y), [])
 
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
@@ -63,16 +298,40 @@ class GameMap:
     def get_actor_at_location(
         self, x: int, y: int, type: Actor = Actor
     ) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y and isinstance(actor, type):
-                return actor
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, type) and entity.is_alive:
+                return entity
 
         return None
 
     def get_resource_at_location(self, x: int, y: int) -> Optional[Resource]:
-        for resource in self.resources:
-            if resource.x == x and resource.y == y:
-                return resource
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, Resource):
+                return entity
+
+    def get_closest_enemy(self, actor: Actor) -> Optional[Actor]:
+        return self.proximity.nearest(
+            actor.x, actor.y, self._hostile_groups(actor), exclude=self._ghosts(actor)
+        )
+
+    def get_closest_resource(self, actor: Actor) -> Optional[Resource]:
+        return self.proximity.nearest(
+            actor.x, actor.y, [("resource", None)], exclude=self._ghosts(actor)
+        )
+
+    def get_closest_friendly_spawner(self, actor: Actor) -> Optional[MobSpawner]:
+        return self.proximity.nearest(
+            actor.x,
+            actor.y,
+            [("spawner", actor.faction)],
+            exclude=self._ghosts(actor),
+        )
+
+    def _ghosts(self, actor: Actor) -> Tuple[Entity, ...]:
+        # things closest-X queries skip: the asker, and the player in ghost mode
+        if self.engine.player_is_ghost:
+            return actor, self.engine.player
+        return (actor,)
 
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= x < self.width and 0 <= y < self.height
@@ -86,16 +345,16 @@ class GameMap:
             default=tile_types.SHROUD,
         )
 
-        entities_sorted_for_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
-        )
+        # only sort what's visible, lowest render order first
+        visible_ids = self.store.visible_ids(self.visible, self.store.ids())
+        visible_ids = visible_ids[
+            np.argsort(self.store.render_order[visible_ids], kind="stable")
+        ]
 
         # for entity in self.entities:
-        for entity in entities_sorted_for_rendering:
-            if self.visible[entity.x, entity.y]:
-                console.print(
-                    x=entity.x, y=entity.y, string=entity.char, fg=entity.color
-                )
+        for store_id in visible_ids:
+            entity = self.store.entities[store_id]
+            console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
 
 
 class GameWorld:
@@ -136,13 +395,15 @@ class GameWorld:
             engine=self.engine,
         )
 
-    def commence_toxic_crisis(self) -> None:
+    def commence_toxic_crisis(self, **options) -> None:
+        # options go to toxic_crisis_level (snake counts)
         from procgen import toxic_crisis_level
 
         self.engine.game_map = toxic_crisis_level(
             map_width=self.map_width,
             map_height=self.map_height,
             engine=self.engine,
+            **options,
         )
 
     # tutorial dungeon maps
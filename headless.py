@@ -0,0 +1,185 @@
+"""
+Play toxic_crisis without a window: no tcod context, no event loop, no
+rendering. A policy picks the player's action every turn and the engine runs
+the rest exactly like the real game. Meant for soak tests and profiling the
+simulation on its own.
+
+    python headless.py --policy hunter --turns 1000 --games 5 --seed 1
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List, Optional
+
+from actions import Action, BumpAction, RangedAction, WaitAction
+from engine import (
+    Engine,
+    OUTCOME_ARREST,
+    OUTCOME_DEAD,
+    OUTCOME_LEVEL_UP,
+    OUTCOME_VICTORY,
+)
+import exceptions
+import setup_game
+import tracing
+
+Policy = Callable[[Engine], Action]
+
+DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+def random_policy(engine: Engine) -> Action:
+    # stumble around, attacking whatever gets bumped into. the policy has its
+    # own stream so it doesn't shift the game's rolls
+    rng = engine.rng.stream("policy")
+    if rng.random() < 0.2:
+        return WaitAction(engine.player)
+    return BumpAction(engine.player, *rng.choice(DIRECTIONS))
+
+
+def wait_policy(engine: Engine) -> Action:
+    return WaitAction(engine.player)
+
+
+def hunter_policy(engine: Engine) -> Action:
+    # shoot the closest visible hostile, otherwise walk towards the nearest
+    player = engine.player
+    game_map = engine.game_map
+    target = game_map.get_closest_enemy(player)
+    if not target:
+        return WaitAction(player)
+    if player.equipment.ranged and game_map.visible[target.x, target.y]:
+        return RangedAction(player, (target.x, target.y))
+    path = engine.flow_fields.path_to_hostiles(player)
+    if not path:
+        return WaitAction(player)
+    dest_x, dest_y = path[0]
+    return BumpAction(player, dest_x - player.x, dest_y - player.y)
+
+
+POLICIES: Dict[str, Policy] = {
+    "random": random_policy,
+    "wait": wait_policy,
+    "hunter": hunter_policy,
+}
+
+
+def run_game(
+    policy: Policy,
+    max_turns: int = 1000,
+    surrender: bool = False,
+    engine: Optional[Engine] = None,
+    seed: Optional[int] = None,
+    ai_budget: Optional[float] = None,
+    **options,
+) -> Dict:
+    """
+    Play one game to the end or max_turns and report how it went. The player
+    always takes max hp on level up, and fights the police unless surrender.
+    A given seed (and policy) plays the same game every time. options go to
+    setup_game.toxic_crisis when no engine is passed in.
+
+    ai_budget is set on the engine, passed in or not. it's wall clock, so
+    leave it None when the game has to replay from its seed.
+
+    Timings are split by phase: the player's action (policy included), the
+    enemy turns, and the rest of the world update (FOV).
+    """
+    setup_started = time.perf_counter()
+    if engine is None:
+        engine = setup_game.toxic_crisis(seed, **options)
+    engine.ai_budget = ai_budget
+    setup_time = time.perf_counter() - setup_started
+
+    outcome = None
+    turns = 0
+    failed_actions = 0
+    player_time = enemy_time = world_time = 0.0
+    started = time.perf_counter()
+    while turns < max_turns:
+        phase_started = time.perf_counter()
+        try:
+            policy(engine).perform()
+        except exceptions.Impossible:
+            # the real game would let the player pick something else, a
+            # headless player just loses the turn
+            failed_actions += 1
+        world_started = time.perf_counter()
+        player_time += world_started - phase_started
+        engine.end_player_turn()
+        world_time += time.perf_counter() - world_started
+        enemy_time += engine.turn_stats.elapsed
+        turns += 1
+
+        outcome = engine.check_outcome()
+        if outcome == OUTCOME_LEVEL_UP:
+            engine.player.level.increase_max_hp()
+            outcome = None
+        elif outcome == OUTCOME_ARREST:
+            if surrender:
+                break
+            engine.resist_arrest()
+            outcome = None
+        elif outcome in (OUTCOME_DEAD, OUTCOME_VICTORY):
+            break
+    elapsed = time.perf_counter() - started
+
+    return {
+        "seed": engine.rng.seed,
+        "outcome": outcome or "timeout",
+        "turns": turns,
+        "score": engine.score,
+        "failed_actions": failed_actions,
+        "actors_left": len(engine.game_map.actors),
+        "ai_budget": engine.ai_budget,
+        # enemy actions taken, and how many of those hit the budget and ran
+        # perform_degraded
+        "actor_turns": engine.turn_stats.actors_total,
+        "degraded_turns": engine.turn_stats.degraded_total,
+        "setup_seconds": round(setup_time, 4),
+        "seconds": round(elapsed, 4),
+        "player_seconds": round(player_time, 4),
+        "enemy_seconds": round(enemy_time, 4),
+        "fov_seconds": round(world_time - enemy_time, 4),
+        "ms_per_turn": round(elapsed / max(turns, 1) * 1000, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="hunter")
+    parser.add_argument("--turns", type=int, default=1000, help="max turns per game")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--surrender", action="store_true", help="go peacefully")
+    parser.add_argument(
+        "--seed", type=int, help="seed of the first game, the rest count up from it"
+    )
+    parser.add_argument(
+        "--ai-budget",
+        type=float,
+        help="seconds of enemy AI per turn, wall clock: games stop replaying "
+        "from their seed",
+    )
+    parser.add_argument("--trace", default="", help='e.g. "combat=debug,procgen=info"')
+    parser.add_argument("--trace-file", help="write traces here instead of stderr")
+    args = parser.parse_args(argv)
+
+    tracing.configure(args.trace)
+    if args.trace_file:
+        tracing.to_file(args.trace_file)
+
+    for game in range(args.games):
+        seed = None if args.seed is None else args.seed + game
+        result = run_game(
+            POLICIES[args.policy],
+            args.turns,
+            args.surrender,
+            seed=seed,
+            ai_budget=args.ai_budget,
+        )
+        print(f"game {game + 1}: " + ", ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
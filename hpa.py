@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+import tcod
+
+from astar import astar
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+CLUSTER_SIZE = 10
+# maps smaller than this (in both dimensions) path on the full grid
+MIN_MAP_SIZE = 100
+# open border runs longer than this get an entrance at each end instead of
+# one in the middle, so paths don't detour to the middle of a wide gap
+MAX_ENTRANCE_WIDTH = 6
+# cost of stepping across a cluster border, entrances are cardinal pairs
+CROSSING_COST = 2
+# inflating the heuristic a little cuts the abstract search by an order of
+# magnitude on noisy maps, for routes a few percent longer
+HEURISTIC_WEIGHT = 1.2
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+Cluster = Tuple[int, int]
+Node = Tuple[int, int]
+
+
+class HierarchicalMap:
+    """
+    HPA* over a GameMap's terrain. The map is cut into CLUSTER_SIZE squares;
+    open stretches of each shared border become entrance nodes, and the walking
+    distance between every pair of entrances inside a cluster is precomputed.
+    A long query searches that small graph, then only the first few legs are
+    refined into tiles, on the live path cost so actors still get stepped
+    around. set_tile marks the touched cluster dirty and it is rebuilt on the
+    next query.
+    """
+
+    def __init__(self, game_map: GameMap, cluster_size: int = CLUSTER_SIZE):
+        self.game_map = game_map
+        self.cluster_size = cluster_size
+        self.columns = (game_map.width + cluster_size - 1) // cluster_size
+        self.rows = (game_map.height + cluster_size - 1) // cluster_size
+        # (cluster, right or lower neighbour) -> (node in first, node in second)
+        self.entrances: Dict[Tuple[Cluster, Cluster], List[Tuple[Node, Node]]] = {}
+        # cluster -> entrance node -> (neighbour node, cost): the other nodes of
+        # the same cluster at their precomputed distance, plus the crossing(s)
+        self.graph: Dict[Cluster, Dict[Node, List[Tuple[Node, int]]]] = {}
+        self.dirty: Set[Cluster] = {
+            (cx, cy) for cx in range(self.columns) for cy in range(self.rows)
+        }
+
+    def cluster_of(self, x: int, y: int) -> Cluster:
+        return x // self.cluster_size, y // self.cluster_size
+
+    def bounds(self, cluster: Cluster) -> Tuple[slice, slice]:
+        cx, cy = cluster
+        size = self.cluster_size
+        return (
+            slice(cx * size, min((cx + 1) * size, self.game_map.width)),
+            slice(cy * size, min((cy + 1) * size, self.game_map.height)),
+        )
+
+    def neighbours(self, cluster: Cluster) -> Iterator[Cluster]:
+        cx, cy = cluster
+        for nx, ny in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            if 0 <= nx < self.columns and 0 <= ny < self.rows:
+                yield nx, ny
+
+    @staticmethod
+    def _border(first: Cluster, second: Cluster) -> Tuple[Cluster, Cluster]:
+        # entrances are keyed upper/left cluster first
+        return (first, second) if first < second else (second, first)
+
+    def invalidate(self, x: int, y: int) -> None:
+        # called by GameMap.set_tile
+        self.dirty.add(self.cluster_of(x, y))
+
+    def _find_entrances(
+        self, first: Cluster, second: Cluster
+    ) -> List[Tuple[Node, Node]]:
+        walkable = self.game_map.tiles["walkable"]
+        x_span, y_span = self.bounds(first)
+        if second[0] > first[0]:  # second is to the right
+            edge = x_span.stop - 1
+            pairs = [
+                ((edge, y), (edge + 1, y)) for y in range(y_span.start, y_span.stop)
+            ]
+        else:  # second is below
+            edge = y_span.stop - 1
+            pairs = [
+                ((x, edge), (x, edge + 1)) for x in range(x_span.start, x_span.stop)
+            ]
+
+        entrances = []
+        run: List[Tuple[Node, Node]] = []
+        for pair in pairs + [None]:
+            if pair is not None and walkable[pair[0]] and walkable[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) > MAX_ENTRANCE_WIDTH:
+                entrances += [run[0], run[-1]]
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+        return entrances
+
+    def _distances_from(self, cluster: Cluster, x: int, y: int) -> np.ndarray:
+        # terrain distances from (x, y) to every tile of the cluster, staying
+        # inside it
+        x_span, y_span = self.bounds(cluster)
+        local_cost = self.game_map.tiles["walkable"][x_span, y_span].astype(np.int8)
+        distance = np.full(local_cost.shape, UNREACHABLE, dtype=np.int32)
+        distance[x - x_span.start, y - y_span.start] = 0
+        tcod.path.dijkstra2d(distance, local_cost, 2, 3, out=distance)
+        return distance
+
+    def _local_distances(
+        self, cluster: Cluster, x: int, y: int, extra: Tuple = ()
+    ) -> Dict[Node, int]:
+        # distances from (x, y) to the cluster's reachable entrance nodes, plus
+        # any extra tiles of the cluster
+        distance = self._distances_from(cluster, x, y)
+        x_span, y_span = self.bounds(cluster)
+        reachable = {}
+        for node in list(self.graph[cluster]) + list(extra):
+            steps = distance[node[0] - x_span.start, node[1] - y_span.start]
+            if steps != UNREACHABLE:
+                reachable[node] = int(steps)
+        return reachable
+
+    def refresh(self) -> None:
+        """Rebuild anything a tile change has touched since the last query."""
+        if not self.dirty:
+            return
+        # a changed cluster changes its borders, which changes its neighbours'
+        # entrances too
+        touched = set(self.dirty)
+        for cluster in self.dirty:
+            for neighbour in self.neighbours(cluster):
+                touched.add(neighbour)
+                key = self._border(cluster, neighbour)
+                self.entrances[key] = self._find_entrances(*key)
+        self.dirty.clear()
+
+        for cluster in touched:
+            links: Dict[Node, List[Node]] = {}
+            for neighbour in self.neighbours(cluster):
+                key = self._border(cluster, neighbour)
+                for pair in self.entrances.get(key, ()):
+                    mine, theirs = pair if key[0] == cluster else pair[::-1]
+                    links.setdefault(mine, []).append(theirs)
+            # the node list has to be in place before the distances are read
+            self.graph[cluster] = dict.fromkeys(links)
+            for node, crossings in links.items():
+                inside = self._local_distances(cluster, *node)
+                del inside[node]
+                self.graph[cluster][node] = list(inside.items()) + [
+                    (other, CROSSING_COST) for other in crossings
+                ]
+
+    def abstract_path(self, start: Node, goal: Node) -> List[Node]:
+        """Entrance-level route from start to goal, empty if there is none."""
+        self.refresh()
+        start_cluster = self.cluster_of(*start)
+        goal_cluster = self.cluster_of(*goal)
+        # a goal in the same cluster may be reachable without leaving it
+        from_start = self._local_distances(
+            start_cluster,
+            *start,
+            extra=(goal,) if start_cluster == goal_cluster else (),
+        )
+        # costs are symmetric, so distances from the goal are distances to it
+        to_goal = self._local_distances(goal_cluster, *goal)
+
+        graph = self.graph
+        size = self.cluster_size
+        goal_x, goal_y = goal
+
+        def edges(node: Node) -> List[Tuple[Node, int]]:
+            found = graph[node[0] // size, node[1] // size].get(node, [])
+            if node == start:
+                found = found + list(from_start.items())
+            if node in to_goal:
+                found = found + [(goal, to_goal[node])]
+            return found
+
+        def heuristic(node: Node) -> float:
+            # exact cost on an empty map with cardinal 2 / diagonal 3
+            dx, dy = abs(node[0] - goal_x), abs(node[1] - goal_y)
+            return HEURISTIC_WEIGHT * (2 * max(dx, dy) + min(dx, dy))
+
+        path = astar(start, goal, edges, heuristic)
+        if not path and start != goal:
+            return []
+        return [start] + path
+
+    def _refine_leg(self, cost: np.ndarray, start: Node, end: Node) -> List[Node]:
+        # tiles from start (excluded) to end, both in the same cluster
+        cluster = self.cluster_of(*start)
+        x_span, y_span = self.bounds(cluster)
+        graph = tcod.path.SimpleGraph(
+            cost=cost[x_span, y_span], cardinal=2, diagonal=3
+        )
+        pathfinder = tcod.path.Pathfinder(graph)
+        pathfinder.add_root((start[0] - x_span.start, start[1] - y_span.start))
+        path = pathfinder.path_to((end[0] - x_span.start, end[1] - y_span.start))[1:]
+        return [(int(x) + x_span.start, int(y) + y_span.start) for x, y in path]
+
+    def find_path(
+        self, start: Node, goal: Node, refine_length: Optional[int] = None
+    ) -> List[Node]:
+        """
+        Tile path from start (excluded) towards goal. Only the legs covering the
+        first refine_length tiles (two clusters' worth by default) are refined,
+        callers replan when they run out. Empty if the goal can't be reached.
+        """
+        if refine_length is None:
+            refine_length = 2 * self.cluster_size
+        route = self.abstract_path(start, goal)
+        cost = self.game_map.path_cost
+        path: List[Node] = []
+        for leg_start, leg_end in zip(route, route[1:]):
+            if len(path) >= refine_length:
+                break
+            if self.cluster_of(*leg_start) == self.cluster_of(*leg_end):
+                path += self._refine_leg(cost, leg_start, leg_end)
+            else:
+                path.append(leg_end)  # a border crossing is a single step
+        return path
@@ -7,8 +7,6 @@ from typing import Callable, Iterable, Optional, Tuple, TYPE_CHECKING, Union
 
 import tcod.event
 
-from procgen import summon_cops
-
 import actions
 from actions import (
     Action,
@@ -20,6 +18,7 @@ from actions import (
 from render_order import RenderOrder
 
 import color
+from engine import OUTCOME_ARREST, OUTCOME_DEAD, OUTCOME_LEVEL_UP, OUTCOME_VICTORY
 import exceptions
 # for auto wait
 # import time
@@ -144,38 +143,15 @@ class EventHandler(BaseEventHandler):
         if isinstance(action_or_state, BaseEventHandler):
             return action_or_state
         if self.handle_action(action_or_state):
-            # if not dead or leveling up, handle conditions
-            player_conditions = self.engine.player.fighter.conditions
-            condition_removal = []
-            for condition in player_conditions:  # this should only affect players?
-                if player_conditions[condition] is not None:
-                    player_conditions[condition].proc()
-                else:
-                    condition_removal.append(condition)
-            for condition in condition_removal:
-                player_conditions.pop(condition)
-            if not self.engine.player.is_alive:
-                if self.engine.police_called:
-                    self.engine.message_log.add_message(
-                        "JUSTICE IS SERVED", (0, 0, 255)
-                    )
+            # conditions proc on the engine's timers now, see Fighter.add_condition
+            outcome = self.engine.check_outcome()
+            if outcome == OUTCOME_DEAD:
                 return GameOverEventHandler(self.engine)
-            elif self.engine.player.level.requires_level_up:
+            elif outcome == OUTCOME_LEVEL_UP:
                 return LevelUpEventHandler(self.engine)
-            elif self.engine.score >= 500 and self.engine.police_called is False:
-                self.engine.message_log.add_message(
-                    "A stern voice rings out over bullhorn:"
-                )
-                self.engine.message_log.add_message(
-                    '"Big Snake Hunter! We have you surrounded! Come out with your hands up!"',
-                    color.enemy_atk,
-                )
-                self.engine.police_called = True
+            elif outcome == OUTCOME_ARREST:
                 return ArrestEventHandler(self.engine)
-            elif (
-                self.engine.police_called is True
-                and len(list(self.engine.game_map.actors)) == 1
-            ):
+            elif outcome == OUTCOME_VICTORY:
                 return VictoryEventHandler(self.engine)
 
             return MainGameEventHandler(self.engine)
@@ -191,9 +167,7 @@ class EventHandler(BaseEventHandler):
             self.engine.message_log.add_message(exc.args[0], color.impossible)
             return False
 
-        self.engine.handle_enemy_turns()
-
-        self.engine.update_fov()
+        self.engine.end_player_turn()
         return True
 
     # def handle_events(self, context: tcod.context.Context) -> None:
@@ -277,10 +251,7 @@ class ArrestEventHandler(AskUserEventHandler):
             return LifeInPrisonEventHandler(self.engine)
 
         elif event.sym == tcod.event.KeySym.N2:
-            self.engine.message_log.add_message(
-                "Then pay with your blood!", (0, 0, 255)
-            )
-            summon_cops(self.engine.game_map, 10)
+            self.engine.resist_arrest()
             return MainGameEventHandler(self.engine)
 
 
@@ -773,8 +744,7 @@ class LookHandler(SelectIndexHandler):
 class PlayerTeleportHandler(SelectIndexHandler):
     # debug tool to teleport player around map
     def on_index_selected(self, x: int, y: int) -> None:
-        self.engine.player.x = x
-        self.engine.player.y = y
+        self.engine.player.place(x, y)
         return MainGameEventHandler(self.engine)
 
 
@@ -960,7 +930,7 @@ class VictoryEventHandler(GameOverEventHandler):
 class HistoryViewer(EventHandler):
     def __init__(self, engine: Engine):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = len(engine.message_log)
         self.cursor = self.log_length - 1
 
     def on_render(self, console: tcod.Console) -> None:
@@ -979,7 +949,8 @@ class HistoryViewer(EventHandler):
             1,
             log_console.width - 2,
             log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
+            # a message takes at least a line, so a screenful is plenty
+            self.engine.message_log.history(self.cursor + 1, log_console.height - 2),
         )
         log_console.blit(console, 3, 3)
 
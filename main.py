@@ -1,9 +1,13 @@
+import argparse
+from typing import Optional
+
 import tcod
 
 # import copy
 import traceback
 
 import color
+from engine import INTERACTIVE_AI_BUDGET
 
 # from engine import Engine
 # import entity_factories
@@ -22,7 +26,7 @@ def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
         print("Game saved!")
 
 
-def main() -> None:
+def main(ai_budget: Optional[float] = INTERACTIVE_AI_BUDGET) -> None:
     terminal_width = 80
     terminal_height = 50
     auto_speed = 0.5
@@ -31,7 +35,7 @@ def main() -> None:
         "data/terminal10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
     )
 
-    handler: input_handlers.BaseEventHandler = setup_game.MainMenu()
+    handler: input_handlers.BaseEventHandler = setup_game.MainMenu(ai_budget)
 
     with tcod.context.new(
         # x=0,
@@ -89,4 +93,12 @@ def main() -> None:
 
 # boilerplate to make sure main only runs when the script is called
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Big Snake Hunter")
+    parser.add_argument(
+        "--ai-budget",
+        type=float,
+        default=INTERACTIVE_AI_BUDGET,
+        help="seconds of enemy AI per turn before it cuts corners, 0 for no limit",
+    )
+    args = parser.parse_args()
+    main(args.ai_budget or None)
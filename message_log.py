@@ -1,33 +1,176 @@
-from typing import Iterable, List, Reversible, Tuple
+from collections import deque
+from typing import Any, Deque, Iterable, List, Optional, Reversible, Tuple
+import bisect
+import io
+import itertools
+import pickle
+import tempfile
 import textwrap
+import zlib
 
 import tcod
 
 import color
 
+# messages kept in memory. past that the oldest SPILL_CHUNK of them (at most
+# half) are compressed into the archive in one go
+CAPACITY = 256
+SPILL_CHUNK = 128
+
 class Message:
-  def __init__(self, text: str, fg: Tuple[int, int, int]):
-    self.plain_text = text
+  # text is template % args, formatted the first time something reads it.
+  # most messages in a big fight get stacked or scroll away unseen
+  __slots__ = ("template", "args", "fg", "count", "_text")
+
+  def __init__(self, template: str, fg: Tuple[int, int, int], args: Tuple = ()):
+    self.template = template
+    self.args = args
     self.fg = fg
     self.count = 1
+    self._text = None if args else template
+
+  @property
+  def plain_text(self) -> str:
+    if self._text is None:
+      self._text = self.template % self.args
+    return self._text
 
   @property
   def full_text(self) -> str:
     if self.count > 1:
       return f'{self.plain_text} (x{self.count})'
     return self.plain_text
-  
-class MessageLog:
+
+
+class MessageArchive:
+  """
+  Append-only store for messages that scrolled out of the log, in a temp
+  file. Each spill is one zlib'd pickle of (template, args, fg, count)
+  records, so paging back through the history only reads the chunk it needs.
+  """
+
   def __init__(self) -> None:
-    self.messages: List[Message] = []
+    self.file: Optional[io.BufferedRandom] = None  # opened on first spill
+    # per chunk: where it is in the file, and the index of its first message
+    self.chunks: List[Tuple[int, int]] = []
+    self.firsts: List[int] = []
+    self.count = 0
+    self._cached: Tuple[int, List[Message]] = (-1, [])
+
+  def __len__(self) -> int:
+    return self.count
+
+  def append(self, messages: List[Message]) -> None:
+    if self.file is None:
+      self.file = tempfile.TemporaryFile()
+    data = zlib.compress(pickle.dumps(
+      [(m.template, m.args, m.fg, m.count) for m in messages],
+      pickle.HIGHEST_PROTOCOL,
+    ))
+    offset = self.file.seek(0, io.SEEK_END)
+    self.file.write(data)
+    self.chunks.append((offset, len(data)))
+    self.firsts.append(self.count)
+    self.count += len(messages)
+
+  def _read_chunk(self, number: int) -> List[Message]:
+    # the history viewer pages back a few lines at a time, keep the last one
+    if self._cached[0] != number:
+      offset, size = self.chunks[number]
+      self.file.seek(offset)
+      messages = []
+      for template, args, fg, count in pickle.loads(
+        zlib.decompress(self.file.read(size))
+      ):
+        message = Message(template, fg, args)
+        message.count = count
+        messages.append(message)
+      self._cached = (number, messages)
+    return self._cached[1]
+
+  def get(self, start: int, stop: int) -> List[Message]:
+    """Archived messages start to stop (oldest is 0)."""
+    result: List[Message] = []
+    number = bisect.bisect_right(self.firsts, start) - 1
+    while start < stop and number < len(self.chunks):
+      first = self.firsts[number]
+      chunk = self._read_chunk(number)
+      result += chunk[start - first : stop - first]
+      start = first + len(chunk)
+      number += 1
+    return result
+
+  def __getstate__(self) -> dict:
+    # saves carry the archive along, it's already compressed
+    data = b""
+    if self.file is not None:
+      self.file.seek(0)
+      data = self.file.read()
+    return {"data": data, "chunks": self.chunks, "firsts": self.firsts,
+            "count": self.count}
+
+  def __setstate__(self, state: dict) -> None:
+    self.file = None
+    if state["data"]:
+      self.file = tempfile.TemporaryFile()
+      self.file.write(state["data"])
+    self.chunks = state["chunks"]
+    self.firsts = state["firsts"]
+    self.count = state["count"]
+    self._cached = (-1, [])
+
+
+class MessageLog:
+  """
+  The latest messages in memory, up to capacity, the rest in a
+  MessageArchive on disk, so a long session doesn't keep growing.
+  """
+
+  def __init__(self, capacity: int = CAPACITY) -> None:
+    self.capacity = capacity
+    self.messages: Deque[Message] = deque()
+    self.archive = MessageArchive()
+
+  def __len__(self) -> int:
+    # the whole history, archived messages included
+    return len(self.archive) + len(self.messages)
 
   def add_message(
-      self, text: str, fg: Tuple[int, int, int] = color.white, *, stack: bool = True,
+      self,
+      text: str,
+      fg: Tuple[int, int, int] = color.white,
+      *args: Any,
+      stack: bool = True,
   ) -> None:
-    if stack and self.messages and text == self.messages[-1].plain_text:
-      self.messages[-1].count += 1
-    else:
-      self.messages.append(Message(text, fg))
+    """
+    text is a %-style template when args are given, e.g.
+    add_message("%s takes %d damage.", color.red, name, damage). Pass plain
+    values (names, numbers), not entities, they're kept until rendered.
+    """
+    if stack and self.messages:
+      last = self.messages[-1]
+      if last.template == text and last.args == args:
+        last.count += 1
+        return
+    self.messages.append(Message(text, fg, args))
+    if len(self.messages) > self.capacity:
+      # never the newest, it may still stack
+      chunk = max(1, min(SPILL_CHUNK, self.capacity // 2))
+      self.archive.append([self.messages.popleft() for _ in range(chunk)])
+
+  def history(self, end: int, count: int) -> List[Message]:
+    """
+    Up to count messages of the whole history, ending just before index end,
+    read back from the archive as needed.
+    """
+    start = max(0, end - count)
+    archived = len(self.archive)
+    result = self.archive.get(start, min(end, archived)) if start < archived else []
+    if end > archived:
+      result += itertools.islice(
+        self.messages, max(start, archived) - archived, end - archived
+      )
+    return result
 
   def render(
       self, console: tcod.console.Console, x: int, y: int, width: int, height: int,
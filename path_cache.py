@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+# replan once the target has wandered more than this many tiles (chebyshev)
+# from where it was when the path was planned
+REPLAN_DISTANCE = 2
+
+
+def next_step_open(
+    game_map: GameMap, path: List[Tuple[int, int]], x: int, y: int
+) -> bool:
+    # can an AI standing at (x, y) take the first step of path right now.
+    # only that step gets checked for new obstructions
+    next_x, next_y = path[0]
+    if max(abs(next_x - x), abs(next_y - y)) != 1:
+        return False  # a step got lost, e.g. a blocked move
+    if not game_map.tiles["walkable"][next_x, next_y]:
+        return False
+    return game_map.get_blocking_entity_at_location(next_x, next_y) is None
+
+
+class PathCacheStats:
+    """Engine-wide hit/miss counters, for tuning REPLAN_DISTANCE."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self) -> None:
+        self.hits = self.misses = 0
+
+
+class PathCache:
+    """
+    An AI's current path plus the target position it was planned for. The
+    path is reused while the target stays close to that position and the next
+    step is still open, otherwise the AI replans.
+    """
+
+    def __init__(self) -> None:
+        self.path: List[Tuple[int, int]] = []
+        self.target_xy: Optional[Tuple[int, int]] = None
+        # the last plan found no route at all. walls don't change during
+        # play, so that holds until the target moves
+        self.no_route = False
+
+    def copy(self) -> PathCache:
+        clone = PathCache()
+        clone.path = list(self.path)
+        clone.target_xy = self.target_xy
+        clone.no_route = self.no_route
+        return clone
+
+    def is_valid(
+        self, game_map: GameMap, x: int, y: int, target_x: int, target_y: int
+    ) -> bool:
+        # (x, y) is where the AI stands now
+        if self.target_xy is None:
+            return False
+        planned_x, planned_y = self.target_xy
+        if max(abs(planned_x - target_x), abs(planned_y - target_y)) > REPLAN_DISTANCE:
+            return False
+        if not self.path:
+            return self.no_route
+        return next_step_open(game_map, self.path, x, y)
+
+    def lookup(
+        self,
+        game_map: GameMap,
+        stats: PathCacheStats,
+        x: int,
+        y: int,
+        target_x: int,
+        target_y: int,
+    ) -> bool:
+        # is_valid plus bookkeeping
+        if self.is_valid(game_map, x, y, target_x, target_y):
+            stats.hits += 1
+            return True
+        stats.misses += 1
+        return False
+
+    def store(self, path: List[Tuple[int, int]], target_x: int, target_y: int) -> None:
+        self.path = path
+        self.target_xy = (target_x, target_y)
+        self.no_route = not path
+
+    def pop_step(self) -> Tuple[int, int]:
+        return self.path.pop(0)
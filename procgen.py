@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from random import Random
 from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
-import random
 import numpy as np
 
 import tile_types
+import tracing
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -15,6 +16,10 @@ import tcod
 import entity_factories
 from game_map import GameMap
 
+# (fewest, most) of each snake a toxic crisis level starts with
+SNAKES = (1, 25)
+BEEF_SNAKES = (1, 1)
+
 max_items_by_floor = [
     (1, 1),
     (4, 2),
@@ -58,6 +63,7 @@ def get_entities_at_random(
     weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
     number_of_entities: int,
     floor: int,
+    rng: Random,
 ) -> List[Entity]:
     entity_weighted_chances = {}
 
@@ -74,7 +80,7 @@ def get_entities_at_random(
     entities = list(entity_weighted_chances.keys())
     entity_weighted_chance_values = list(entity_weighted_chances.values())
 
-    chosen_entities = random.choices(
+    chosen_entities = rng.choices(
         entities, weights=entity_weighted_chance_values, k=number_of_entities
     )
 
@@ -140,11 +146,12 @@ def place_entities(
     #       entity_factories.troll.spawn(dungeon, x, y)
     # for i in range(number_of_items):
     # for entity in monsters + items:
+    rng = dungeon.engine.rng.spawn
     for mob in range(number_of_entities):
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
 
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+        if not dungeon.get_entities_at_location(x, y):
             # entity_factories.health_potion.spawn(dungeon, x, y)
             # item_chance = random.random()
 
@@ -160,13 +167,13 @@ def place_entities(
 
 
 def tunnel_between(
-    start: Tuple[int, int], end: Tuple[int, int]
+    start: Tuple[int, int], end: Tuple[int, int], rng: Random
 ) -> Iterator[Tuple[int, int]]:
     x1, y1 = start
     x2, y2 = end
 
     # decides randomly whether to go horizontal then vertical or vice versa
-    if random.random() < 0.5:
+    if rng.random() < 0.5:
         corner_x, corner_y = x2, y1
     else:
         corner_x, corner_y = x1, y2
@@ -194,24 +201,37 @@ def tunnel_between(
 
 
 def summon_cops(dungeon: GameMap, amount: int) -> None:
+    rng = dungeon.engine.rng.spawn
     for cop in range(amount):
-        x = random.randint(1, dungeon.width - 1)
-        y = random.randint(1, dungeon.height - 1)
+        x = rng.randint(1, dungeon.width - 1)
+        y = rng.randint(1, dungeon.height - 1)
         if dungeon.get_blocking_entity_at_location(x, y):
-            print("wall in way, cop skipped")
+            tracing.procgen.debug("wall in way, cop skipped at %d, %d", x, y)
             continue
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+        if not dungeon.get_entities_at_location(x, y):
             entity_factories.cop.spawn(dungeon, x, y)
 
 
 def generate_crystals(dungeon: GameMap, amount: int) -> None:
+    rng = dungeon.engine.rng.spawn
     for crystal in range(amount):
-        x = random.randint(1, dungeon.width - 1)
-        y = random.randint(1, dungeon.height - 1)
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+        x = rng.randint(1, dungeon.width - 1)
+        y = rng.randint(1, dungeon.height - 1)
+        if not dungeon.get_entities_at_location(x, y):
             entity_factories.crystal_well.spawn(dungeon, x, y)
 
 
+def scatter_walls(
+    dungeon: GameMap, room: RectangularRoom, rng: np.random.Generator
+) -> None:
+    # a third of the room's tiles become walls, the rest floor, in one draw
+    # instead of a roll per tile
+    inner = dungeon.tiles[room.inner]
+    walls = rng.integers(0, 3, size=inner.shape) == 0
+    inner[...] = tile_types.floor
+    inner[walls] = tile_types.wall
+
+
 def test_level(  # for testing new mechanics, mobs, etc
     map_width: int, map_height: int, engine: Engine
 ) -> GameMap:
@@ -219,13 +239,7 @@ def test_level(  # for testing new mechanics, mobs, etc
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
 
     room = RectangularRoom(1, 1, map_width - 2, map_height - 2)
-    with np.nditer(dungeon.tiles[room.inner], op_flags=["readwrite"]) as zone:
-        for tile in zone:
-            cointoss = random.randint(0, 2)
-            if cointoss == 0:
-                tile[...] = tile_types.wall
-            else:
-                tile[...] = tile_types.floor
+    scatter_walls(dungeon, room, engine.rng.numpy)
 
     # for i in np.ndindex(dungeon.tiles.shape):
 
@@ -249,18 +263,17 @@ def toxic_crisis_level(
     map_width: int,
     map_height: int,
     engine: Engine,
+    snakes: Tuple[int, int] = SNAKES,
+    beef_snakes: Tuple[int, int] = BEEF_SNAKES,
 ) -> GameMap:
     player = engine.player
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    # spawner and police battles pile up bodies, recycle the oldest ones
+    dungeon.corpse_limit = 200
+    rng = engine.rng.map
 
     room = RectangularRoom(0, 0, map_width - 1, map_height - 1)
-    with np.nditer(dungeon.tiles[room.inner], op_flags=["readwrite"]) as zone:
-        for tile in zone:
-            cointoss = random.randint(0, 2)
-            if cointoss == 0:
-                tile[...] = tile_types.wall
-            else:
-                tile[...] = tile_types.floor
+    scatter_walls(dungeon, room, engine.rng.numpy)
 
     player.place(*room.center, dungeon)
     dungeon.tiles[room.center] = tile_types.floor
@@ -276,16 +289,18 @@ def toxic_crisis_level(
     unreachable = list(zip([int(s) for s in x], [int(t) for t in y]))
     for tile in unreachable:
         if dungeon.tiles["walkable"][tile[0], tile[1]]:
-            print(f"{tile} filled!")
-            dungeon.tiles[tile] = tile_types.red_wall
+            tracing.procgen.debug("%s filled!", tile)
+            dungeon.set_tile(*tile, tile_types.red_wall)
 
     # print(len(unreachable))
     # print(unreachable)
     # unreachable = pathfinder.distance != np.iinfo(pathfinder.distance.dtype).max
     # dungeon.tiles[unreachable] = tile_types.wall
 
-    place_entities(room, dungeon, entity_factories.snake, random.randint(1, 25))
-    place_entities(room, dungeon, entity_factories.beef_snake, random.randint(1, 1))
+    place_entities(room, dungeon, entity_factories.snake, rng.randint(*snakes))
+    place_entities(
+        room, dungeon, entity_factories.beef_snake, rng.randint(*beef_snakes)
+    )
 
     return dungeon
 
@@ -302,6 +317,7 @@ def generate_dungeon(
 ) -> GameMap:
     player = engine.player
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    rng = engine.rng.map
 
     # for row in range(len(dungeon.tiles)):
     #     for tile in range(len(row)):
@@ -313,11 +329,11 @@ def generate_dungeon(
     center_of_last_room = (0, 0)
 
     for r in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        x = rng.randint(0, dungeon.width - room_width - 1)
+        y = rng.randint(0, dungeon.height - room_height - 1)
 
         new_room = RectangularRoom(x, y, room_width, room_height)
 
@@ -330,7 +346,7 @@ def generate_dungeon(
             # player.x, player.y = new_room.center
             player.place(*new_room.center, dungeon)
         else:
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
+            for x, y in tunnel_between(rooms[-1].center, new_room.center, rng):
                 dungeon.tiles[x, y] = tile_types.floor
 
                 center_of_last_room = new_room.center
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Collection, Dict, Hashable, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+CELL_SIZE = 8
+
+Cell = Tuple[int, int]
+
+
+class ProximityGrid:
+    """
+    Uniform grid of CELL_SIZE x CELL_SIZE buckets, kept separately per group
+    (a faction's living actors, a faction's spawners, resources, ...). GameMap
+    updates it as entities are added, removed, moved or killed, and nearest
+    queries only look at the buckets around the query point instead of every
+    entity on the map.
+    """
+
+    def __init__(self, width: int, height: int, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.columns = (width + cell_size - 1) // cell_size
+        self.rows = (height + cell_size - 1) // cell_size
+        # group -> cell -> entities, dicts for a stable iteration order
+        self.groups: Dict[Hashable, Dict[Cell, Dict[Entity, None]]] = {}
+
+    def cell_of(self, x: int, y: int) -> Cell:
+        return x // self.cell_size, y // self.cell_size
+
+    def insert(self, group: Hashable, entity: Entity) -> None:
+        cells = self.groups.setdefault(group, {})
+        cells.setdefault(self.cell_of(entity.x, entity.y), {})[entity] = None
+
+    def remove(self, group: Hashable, entity: Entity) -> None:
+        cells = self.groups[group]
+        cell = self.cell_of(entity.x, entity.y)
+        del cells[cell][entity]
+        if not cells[cell]:
+            del cells[cell]
+
+    def move(self, group: Hashable, entity: Entity, x: int, y: int) -> None:
+        # call before entity.x/y are updated
+        old_cell = self.cell_of(entity.x, entity.y)
+        new_cell = self.cell_of(x, y)
+        if old_cell != new_cell:
+            cells = self.groups[group]
+            del cells[old_cell][entity]
+            if not cells[old_cell]:
+                del cells[old_cell]
+            cells.setdefault(new_cell, {})[entity] = None
+
+    def _ring(self, center: Cell, radius: int) -> Iterator[Cell]:
+        # cells at exactly Chebyshev distance radius from center
+        cx, cy = center
+        if radius == 0:
+            yield center
+            return
+        for dx in range(-radius, radius + 1):
+            yield cx + dx, cy - radius
+            yield cx + dx, cy + radius
+        for dy in range(-radius + 1, radius):
+            yield cx - radius, cy + dy
+            yield cx + radius, cy + dy
+
+    def nearest(
+        self,
+        x: int,
+        y: int,
+        groups: Iterable[Hashable],
+        exclude: Collection[Entity] = (),
+    ) -> Optional[Entity]:
+        """Closest entity (euclidean) in any of the groups, or None."""
+        group_cells = [self.groups[group] for group in groups if self.groups.get(group)]
+        if not group_cells:
+            return None
+
+        center = self.cell_of(x, y)
+        closest = None
+        closest_distance = 0
+        for radius in range(max(self.columns, self.rows) + 1):
+            if closest is not None:
+                # nothing in this ring can be closer than its inner edge
+                edge = (radius - 1) * self.cell_size + 1
+                if edge * edge > closest_distance:
+                    break
+            for cell in self._ring(center, radius):
+                for cells in group_cells:
+                    for entity in cells.get(cell, ()):
+                        if entity in exclude:
+                            continue
+                        distance = (entity.x - x) ** 2 + (entity.y - y) ** 2
+                        if closest is None or distance < closest_distance:
+                            closest = entity
+                            closest_distance = distance
+        return closest
+
+    def within(
+        self, x: int, y: int, radius: int, groups: Iterable[Hashable]
+    ) -> Iterator[Entity]:
+        """Entities in the groups within a euclidean radius of (x, y)."""
+        low_x, low_y = self.cell_of(max(0, x - radius), max(0, y - radius))
+        high_x, high_y = self.cell_of(x + radius, y + radius)
+        for group in groups:
+            cells = self.groups.get(group)
+            if not cells:
+                continue
+            for cell_x in range(low_x, high_x + 1):
+                for cell_y in range(low_y, high_y + 1):
+                    for entity in cells.get((cell_x, cell_y), ()):
+                        if (entity.x - x) ** 2 + (entity.y - y) ** 2 <= radius**2:
+                            yield entity
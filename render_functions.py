@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Tuple, TYPE_CHECKING
 
 import color
+from combat import AttackRecord
 
 if TYPE_CHECKING:
     from tcod import Console
@@ -15,9 +16,7 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
         return ""
 
     names = ", ".join(
-        entity.get_name()
-        for entity in game_map.entities
-        if entity.x == x and entity.y == y
+        entity.get_name() for entity in game_map.get_entities_at_location(x, y)
     )
 
     return names.capitalize()
@@ -58,3 +57,31 @@ def render_names_at_mouse_location(
     )
 
     console.print(x=x, y=y, string=names_at_mouse_location)
+
+
+def render_attack_odds_at_mouse_location(
+    console: Console, x: int, y: int, engine: Engine
+) -> None:
+    # what the player's attack would do to whoever is under the mouse, from
+    # the cached odds tables. the gun if one is equipped, else melee
+    mouse_x, mouse_y = engine.mouse_location
+    game_map = engine.game_map
+    player = engine.player
+    if not game_map.in_bounds(mouse_x, mouse_y) or not game_map.visible[
+        mouse_x, mouse_y
+    ]:
+        return
+    target = game_map.get_actor_at_location(mouse_x, mouse_y)
+    if target is None or target is player or not player.is_alive:
+        return
+
+    if player.equipment.ranged:
+        odds = AttackRecord.ranged(player, target).odds
+    else:
+        odds = AttackRecord.melee(player, target).odds
+    console.print(
+        x=x,
+        y=y,
+        string=f"Hit {odds.hit_chance:.0%}, ~{odds.expected_damage:.1f} dmg",
+        fg=color.player_atk,
+    )
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import Dict, Optional
+
+import numpy as np
+
+# streams the game draws from. each is seeded from the game seed and its own
+# name, so an extra roll in combat doesn't shift the map or the AI
+MAP = "map"
+COMBAT = "combat"
+AI = "ai"
+SPAWN = "spawn"
+
+
+class GameRandom:
+    """
+    All the randomness of one game, owned by the Engine. Named substreams are
+    plain random.Random instances, or numpy Generators for vectorized draws
+    (numpy itself is the map's).
+    The same seed replays the same game, and the whole thing pickles with the
+    save so a loaded game carries on where it left off.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.seed = seed
+        self.streams: Dict[str, random.Random] = {}
+        self.numpy_streams: Dict[str, np.random.Generator] = {}
+        self.numpy = np.random.default_rng(seed)
+
+    def stream(self, name: str) -> random.Random:
+        # str seeds are hashed with sha512, stable across runs and platforms
+        if name not in self.streams:
+            self.streams[name] = random.Random(f"{self.seed}:{name}")
+        return self.streams[name]
+
+    def numpy_stream(self, name: str) -> np.random.Generator:
+        # seeded from the same string as stream(name), hashed the same way
+        if name not in self.numpy_streams:
+            digest = hashlib.sha512(f"{self.seed}:{name}".encode()).digest()
+            self.numpy_streams[name] = np.random.default_rng(
+                int.from_bytes(digest, "big")
+            )
+        return self.numpy_streams[name]
+
+    @property
+    def map(self) -> random.Random:
+        return self.stream(MAP)
+
+    @property
+    def combat(self) -> random.Random:
+        return self.stream(COMBAT)
+
+    @property
+    def combat_numpy(self) -> np.random.Generator:
+        return self.numpy_stream(COMBAT)
+
+    @property
+    def ai(self) -> random.Random:
+        return self.stream(AI)
+
+    @property
+    def spawn(self) -> random.Random:
+        return self.stream(SPAWN)
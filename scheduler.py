@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterator, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+# game time covered by one enemy turn. an actor at NORMAL_SPEED acts once per
+# turn, one at twice that acts twice, one at half of it every other turn
+TURN_TIME = 100
+NORMAL_SPEED = 100
+
+
+class TurnScheduler:
+    """
+    The actors GameMap runs AI for, in a heap keyed by when their next action
+    is due. Ties go to whoever was scheduled first, so turn order is the same
+    every run. Removing an actor only marks its heap entry dead, the entry is
+    dropped once it reaches the top.
+    """
+
+    def __init__(self) -> None:
+        # start of the next turn that hasn't run yet
+        self.next_turn = 0
+        # [due time, sequence, actor or None once removed]
+        self.heap: List[list] = []
+        self.entries: Dict[Actor, list] = {}
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.entries
+
+    @staticmethod
+    def delay(actor: Actor) -> int:
+        # time between two actions of this actor
+        return max(1, TURN_TIME * NORMAL_SPEED // max(actor.speed, 1))
+
+    def schedule(self, actor: Actor, due: int) -> None:
+        self.remove(actor)
+        entry = [due, self.sequence, actor]
+        self.sequence += 1
+        self.entries[actor] = entry
+        heapq.heappush(self.heap, entry)
+
+    def add(self, actor: Actor) -> None:
+        # new actors first act in the next turn, even ones spawned mid-turn
+        self.schedule(actor, self.next_turn)
+
+    def remove(self, actor: Actor) -> None:
+        entry = self.entries.pop(actor, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def due(self) -> List[Actor]:
+        """Actors acting in the next turn, unordered, to batch work ahead of it."""
+        end = self.next_turn + TURN_TIME
+        return [
+            entry[-1] for entry in self.heap if entry[0] < end and entry[-1] is not None
+        ]
+
+    def run_turn(self) -> Iterator[Actor]:
+        """Yield actors in the order they act this turn, fast ones repeatedly."""
+        end = self.next_turn + TURN_TIME
+        self.next_turn = end
+        while self.heap and self.heap[0][0] < end:
+            due, _, actor = heapq.heappop(self.heap)
+            if actor is None:
+                continue
+            # book the next action before this one happens, so an actor that
+            # gets removed while acting takes the new entry with it
+            self.schedule(actor, due + self.delay(actor))
+            yield actor
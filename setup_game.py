@@ -9,7 +9,7 @@ from typing import Optional
 import tcod
 
 import color
-from engine import Engine
+from engine import Engine, INTERACTIVE_AI_BUDGET, POLICE_SCORE
 import entity_factories
 from game_map import GameWorld
 import input_handlers
@@ -19,7 +19,7 @@ from render_order import RenderOrder
 background_image = tcod.image.load("data/title_screen.png")[:, :, :3]
 
 
-def test_level() -> Engine:
+def test_level(seed: Optional[int] = None) -> Engine:
     map_width = 50  # formerly 80
     map_height = 50  # formerly 43
     room_max_size = 10
@@ -28,7 +28,7 @@ def test_level() -> Engine:
 
     player = copy.deepcopy(entity_factories.player)
 
-    engine = Engine(player=player)
+    engine = Engine(player=player, seed=seed)
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -68,7 +68,10 @@ def test_level() -> Engine:
     return engine
 
 
-def toxic_crisis() -> Engine:
+def toxic_crisis(
+    seed: Optional[int] = None, police_score: int = POLICE_SCORE, **options
+) -> Engine:
+    # options go to procgen.toxic_crisis_level, e.g. snakes=(10, 10)
     map_width = 50  # formerly 80
     map_height = 50  # formerly 43
     room_max_size = 10
@@ -77,7 +80,8 @@ def toxic_crisis() -> Engine:
 
     player = copy.deepcopy(entity_factories.player)
 
-    engine = Engine(player=player)
+    engine = Engine(player=player, seed=seed)
+    engine.police_score = police_score
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -87,7 +91,7 @@ def toxic_crisis() -> Engine:
         map_width=map_width,
         map_height=map_height,
     )
-    engine.game_world.commence_toxic_crisis()
+    engine.game_world.commence_toxic_crisis(**options)
     engine.do_fov = True
 
     engine.player_is_ghost = False
@@ -128,7 +132,7 @@ def toxic_crisis() -> Engine:
     return engine
 
 
-def new_game() -> Engine:
+def new_game(seed: Optional[int] = None) -> Engine:
     map_width = 80
     map_height = 43
 
@@ -141,7 +145,7 @@ def new_game() -> Engine:
 
     player = copy.deepcopy(entity_factories.player)
 
-    engine = Engine(player=player)
+    engine = Engine(player=player, seed=seed)
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -181,6 +185,14 @@ def load_game(filename: str) -> Engine:
 
 
 class MainMenu(input_handlers.BaseEventHandler):
+    def __init__(self, ai_budget: Optional[float] = INTERACTIVE_AI_BUDGET):
+        # given to every game started or loaded from here
+        self.ai_budget = ai_budget
+
+    def start(self, engine: Engine) -> input_handlers.MainGameEventHandler:
+        engine.ai_budget = self.ai_budget
+        return input_handlers.MainGameEventHandler(engine)
+
     def on_render(self, console: tcod.console.Console) -> None:
         console.draw_semigraphics(background_image, 0, 0)
 
@@ -226,15 +238,15 @@ class MainMenu(input_handlers.BaseEventHandler):
         elif event.sym == tcod.event.KeySym.C:
             # pass #load game
             try:
-                return input_handlers.MainGameEventHandler(load_game("savegame.sav"))
+                return self.start(load_game("savegame.sav"))
             except FileNotFoundError:
                 return input_handlers.PopupMessage(self, "No saved game to load.")
             except Exception as exc:
                 traceback.print_exc()
                 return input_handlers.PopupMessage(self, f"Failed to load save:\n{exc}")
         elif event.sym == tcod.event.KeySym.N:
-            return input_handlers.MainGameEventHandler(toxic_crisis())
+            return self.start(toxic_crisis())
         elif event.sym == tcod.event.KeySym.T:
-            return input_handlers.MainGameEventHandler(test_level())
+            return self.start(test_level())
 
         return None
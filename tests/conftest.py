@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the game modules live at the top of the repo and setup_game loads its
+# images relative to it
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+@pytest.fixture
+def engine():
+    """A seeded toxic_crisis game a few dozen turns in, cops and all."""
+    import headless
+    import procgen
+    import setup_game
+
+    engine = setup_game.toxic_crisis(5)
+    procgen.summon_cops(engine.game_map, 10)
+    headless.run_game(headless.hunter_policy, 60, engine=engine)
+    return engine
@@ -0,0 +1,55 @@
+import pytest
+
+import entity_factories
+
+
+def open_neighbours(game_map, x, y):
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            nx, ny = x + dx, y + dy
+            if (dx or dy) and game_map.tiles["walkable"][nx, ny]:
+                if not list(game_map.get_entities_at_location(nx, ny)):
+                    yield nx, ny
+
+
+@pytest.fixture
+def snake(engine):
+    # a snake with two free tiles next to it, nobody hostile in reach
+    game_map = engine.game_map
+    player = engine.player
+    for x in range(1, game_map.width - 1):
+        for y in range(1, game_map.height - 1):
+            if max(abs(x - player.x), abs(y - player.y)) < 5:
+                continue
+            if not game_map.tiles["walkable"][x, y] or list(
+                game_map.get_entities_at_location(x, y)
+            ):
+                continue
+            if len(list(open_neighbours(game_map, x, y))) >= 2:
+                return entity_factories.snake.spawn(game_map, x, y)
+    pytest.fail("no room for a snake")
+
+
+def test_degraded_turn_follows_an_open_path(snake):
+    step = next(open_neighbours(snake.gamemap, snake.x, snake.y))
+    snake.ai.path_cache.store([step], 0, 0)
+    snake.ai.perform_degraded()
+    assert (snake.x, snake.y) == step
+
+
+def test_degraded_turn_waits_when_the_next_step_is_blocked(snake):
+    start = snake.x, snake.y
+    step = next(open_neighbours(snake.gamemap, *start))
+    entity_factories.snake.spawn(snake.gamemap, *step)
+    snake.ai.path_cache.store([step], 0, 0)
+    snake.ai.perform_degraded()
+    assert (snake.x, snake.y) == start
+    assert snake.ai.waited
+
+
+def test_degraded_turn_waits_when_the_path_is_stale(snake):
+    start = snake.x, snake.y
+    snake.ai.path_cache.store([(start[0] + 3, start[1])], 0, 0)
+    snake.ai.perform_degraded()
+    assert (snake.x, snake.y) == start
+    assert snake.ai.waited
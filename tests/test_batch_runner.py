@@ -0,0 +1,25 @@
+import csv
+
+import batch_runner
+
+
+def test_summary_rows_match_csv_columns():
+    result = {
+        "max_snakes": 5,
+        "poison_die": 2,
+        "police_score": 300,
+        "outcome": "dead",
+        "turns": 10,
+        "score": 100,
+        "seconds": 0.1,
+    }
+    result.update(dict.fromkeys(batch_runner.TIMINGS, 0.01))
+    (row,) = batch_runner.summarize([result])
+    assert list(row) == batch_runner.SUMMARY_FIELDS
+
+
+def test_empty_csv_gets_a_header(tmp_path):
+    path = tmp_path / "empty.csv"
+    batch_runner.write_csv(str(path), batch_runner.summarize([]))
+    with open(path, newline="") as f:
+        assert list(csv.reader(f)) == [batch_runner.SUMMARY_FIELDS]
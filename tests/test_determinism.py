@@ -0,0 +1,43 @@
+from engine import INTERACTIVE_AI_BUDGET
+import headless
+import setup_game
+
+TURNS = 150
+
+
+def replay(seed):
+    engine = setup_game.toxic_crisis(seed)
+    result = headless.run_game(headless.hunter_policy, TURNS, engine=engine)
+    log = engine.message_log
+    messages = [message.full_text for message in log.history(len(log), len(log))]
+    return result, messages
+
+
+def test_same_seed_plays_same_game():
+    first, first_log = replay(7)
+    second, second_log = replay(7)
+    assert first_log  # something actually happened
+    assert first_log == second_log
+    for key in ("outcome", "turns", "score", "actors_left"):
+        assert first[key] == second[key]
+
+
+def test_run_game_drops_wall_clock_budget():
+    engine = setup_game.toxic_crisis(7)
+    engine.ai_budget = 0.0
+    headless.run_game(headless.wait_policy, 1, engine=engine)
+    assert engine.ai_budget is None
+
+
+def test_budget_shows_up_in_results():
+    # nothing fits in a zero budget, every enemy action is degraded
+    result = headless.run_game(headless.hunter_policy, 30, seed=7, ai_budget=0.0)
+    assert result["ai_budget"] == 0.0
+    assert result["actor_turns"] > 0
+    assert result["degraded_turns"] == result["actor_turns"]
+
+
+def test_windowed_game_gets_the_interactive_budget():
+    engine = setup_game.toxic_crisis(7)
+    setup_game.MainMenu().start(engine)
+    assert engine.ai_budget == INTERACTIVE_AI_BUDGET
@@ -0,0 +1,85 @@
+from components.base_component import state_names
+import entity_factories
+import entity_pool
+
+
+def describe(actor):
+    """Everything about an actor a respawn should start over, as plain values."""
+    ai = actor.ai
+    return {
+        "entity": (
+            actor.char,
+            actor.color,
+            actor.name,
+            actor.blocks_movement,
+            actor.render_order,
+            actor.faction,
+            actor.speed,
+            actor.pool_name,
+        ),
+        "fighter": (
+            actor.fighter.hp,
+            actor.fighter.max_hp,
+            actor.fighter.base_armor,
+            actor.fighter.base_dodge,
+            actor.fighter.base_accuracy,
+            actor.fighter.natural_weapon,
+            dict(actor.fighter.conditions),
+        ),
+        "level": {
+            name: getattr(actor.level, name)
+            for name in state_names(actor.level)
+            if name != "parent"
+        },
+        "inventory": [item.name for item in actor.inventory.items],
+        "equipment": [
+            getattr(getattr(actor.equipment, slot), "name", None)
+            for slot in ("weapon", "armor", "ranged")
+        ],
+        "ai": (
+            type(ai),
+            ai.idle_turns,
+            ai.waited,
+            ai.target,
+            ai.path_cache.path,
+            ai.path_cache.target_xy,
+            ai.path_cache.no_route,
+        ),
+    }
+
+
+def test_recycled_actor_is_fully_reset(engine):
+    prototype = entity_factories.cop
+    pool = entity_pool.pools["cop"]
+    pool.free.clear()
+    player = engine.player
+    cop = prototype.spawn(engine.game_map, player.x, player.y)
+    fresh = describe(prototype.clone())
+
+    # rough it up every way a game can
+    cop.speed = 1
+    cop.level.current_xp += 5
+    cop.inventory.items.clear()
+    cop.equipment.ranged = None
+    cop.ai.idle_turns = 3
+    cop.ai.waited = True
+    cop.ai.target = player
+    cop.ai.path_cache.store([(1, 1)], 1, 1)
+    cop.fighter.add_condition(entity_factories.mamba_madness.clone())
+    cop.fighter.hp = 0  # dies: renamed, unblocked, no AI
+    cop.recycle()
+
+    respawned = prototype.spawn(engine.game_map, player.x, player.y)
+    assert respawned is cop
+    assert describe(respawned) == fresh
+
+    # and it owns its parts again rather than sharing the prototype's
+    assert respawned.ai.entity is respawned
+    assert respawned.fighter.parent is respawned
+    assert respawned.fighter.conditions is not prototype.fighter.conditions
+    assert respawned.level.parent is respawned
+    items = respawned.inventory.items
+    assert items and not set(map(id, items)) & set(map(id, prototype.inventory.items))
+    assert all(item.parent is respawned.inventory for item in items)
+    assert respawned.equipment.ranged is items[0]
+    assert respawned in engine.game_map.scheduler
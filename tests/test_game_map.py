@@ -0,0 +1,56 @@
+import numpy as np
+
+import entity_factories
+
+
+def expected_index(game_map):
+    index = {}
+    for entity in game_map.entities:
+        index.setdefault((entity.x, entity.y), set()).add(entity)
+    return index
+
+
+def expected_cost(game_map):
+    cost = np.array(game_map.tiles["walkable"], dtype=np.int8)
+    for entity in game_map.entities:
+        if entity.blocks_movement and cost[entity.x, entity.y]:
+            cost[entity.x, entity.y] += 10
+    return cost
+
+
+def assert_in_sync(game_map):
+    index = {xy: set(entities) for xy, entities in game_map.entity_index.items()}
+    assert index == expected_index(game_map)
+    assert (game_map.path_cost == expected_cost(game_map)).all()
+
+
+def test_index_and_path_cost_track_a_played_game(engine):
+    assert_in_sync(engine.game_map)
+
+
+def open_cells(game_map):
+    for x in range(game_map.width):
+        for y in range(game_map.height):
+            if game_map.tiles["walkable"][x, y] and not list(
+                game_map.get_entities_at_location(x, y)
+            ):
+                yield x, y
+
+
+def test_index_and_path_cost_track_spawns_moves_and_deaths(engine):
+    game_map = engine.game_map
+    cells = open_cells(game_map)
+    snake = entity_factories.snake.spawn(game_map, *next(cells))
+    assert_in_sync(game_map)
+
+    x, y = next(cells)
+    snake.move(x - snake.x, y - snake.y)
+    assert_in_sync(game_map)
+
+    # the corpse stays on the map but stops blocking
+    snake.fighter.hp = 0
+    assert not snake.blocks_movement
+    assert_in_sync(game_map)
+
+    game_map.remove_entity(snake)
+    assert_in_sync(game_map)
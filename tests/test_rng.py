@@ -0,0 +1,13 @@
+from rng import GameRandom
+
+
+def test_combat_rolls_ignore_map_draws():
+    quiet, busy = GameRandom(3), GameRandom(3)
+    busy.numpy.random(1000)  # a bigger map
+    busy.map.random()
+    assert (quiet.combat_numpy.random(8) == busy.combat_numpy.random(8)).all()
+
+
+def test_numpy_streams_follow_the_seed():
+    assert GameRandom(3).combat_numpy.random() == GameRandom(3).combat_numpy.random()
+    assert GameRandom(3).combat_numpy.random() != GameRandom(4).combat_numpy.random()
@@ -0,0 +1,51 @@
+def expected_actors(engine):
+    # everyone alive with an AI that acts on its turns, bar the player
+    return {
+        actor
+        for actor in engine.game_map.actors
+        if actor is not engine.player and actor.ai.takes_turns
+    }
+
+
+def assert_in_sync(engine):
+    game_map = engine.game_map
+    scheduler = game_map.scheduler
+    active = set(scheduler.entries)
+    dormant = set(game_map.dormant)
+    assert not active & dormant
+    assert active | dormant == expected_actors(engine)
+    # every live heap entry is the one on record for its actor, no strays
+    live = [entry for entry in scheduler.heap if entry[-1] is not None]
+    assert len(live) == len(scheduler.entries)
+    assert all(scheduler.entries[entry[-1]] is entry for entry in live)
+    assert {
+        actor
+        for cell in game_map.proximity.groups.get(("dormant", None), {}).values()
+        for actor in cell
+    } == dormant
+
+
+def test_heap_tracks_active_and_dormant_actors(engine):
+    game_map = engine.game_map
+    assert game_map.dormant  # idle snakes far from the player fell asleep
+    assert_in_sync(engine)
+
+    sleeper = next(iter(game_map.dormant))
+    game_map.wake(sleeper)
+    assert sleeper in game_map.scheduler
+    assert_in_sync(engine)
+
+    game_map.sleep(sleeper)
+    assert sleeper not in game_map.scheduler
+    assert_in_sync(engine)
+
+
+def test_dead_actors_leave_the_heap(engine):
+    game_map = engine.game_map
+    sleeper = next(iter(game_map.dormant))
+    awake = next(iter(game_map.scheduler.entries))
+    for actor in (sleeper, awake):
+        actor.fighter.hp = 0
+        assert_in_sync(engine)
+    engine.handle_enemy_turns()
+    assert_in_sync(engine)
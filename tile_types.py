@@ -1,7 +1,7 @@
 from typing import Tuple
 
 import numpy as np
-from random import randint
+from random import Random
 
 # dt is like a struct in C. our dt is: a 32 bit int, and 3 unsigned bytes x2
 # for foreground and background color? i'm sure this will make sense later
@@ -38,8 +38,8 @@ def new_tile(
 SHROUD = np.array((ord(" "), (255, 255, 255), (0, 0, 0)), dtype=graphic_dt)
 
 
-def random_color():
-    colors = (randint(0, 255), randint(0, 255), randint(0, 255))
+def random_color(rng: Random):
+    colors = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
     return colors
 
 
@@ -79,8 +79,8 @@ down_stairs = new_tile(
 )
 
 
-def random() -> new_tile:
-    coin_flip = randint(0, 1)
+def random(rng: Random) -> new_tile:
+    coin_flip = rng.randint(0, 1)
     if coin_flip == 0:
         return floor
     else:
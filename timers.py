@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import heapq
+from typing import Callable, Iterator, List
+
+Callback = Callable[[], None]
+
+
+class TimerQueue:
+    """
+    Callbacks due at a given engine turn, in a heap. A turn only pays for the
+    events that fire in it, so poison ticks and spawn timers cost nothing
+    while they're waiting. Cancelling just blanks the entry, it gets dropped
+    once it comes due.
+    """
+
+    def __init__(self) -> None:
+        # [due turn, sequence, callback or None once cancelled]
+        self.heap: List[list] = []
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, turn: int, callback: Callback) -> list:
+        # returns the entry, keep it if you might need to cancel()
+        entry = [turn, self.sequence, callback]
+        self.sequence += 1
+        heapq.heappush(self.heap, entry)
+        return entry
+
+    @staticmethod
+    def cancel(entry: list) -> None:
+        entry[-1] = None
+
+    def pop_due(self, turn: int) -> Iterator[Callback]:
+        """Callbacks due at or before turn, in the order they were scheduled."""
+        while self.heap and self.heap[0][0] <= turn:
+            callback = heapq.heappop(self.heap)[-1]
+            if callback is not None:
+                yield callback
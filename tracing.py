@@ -0,0 +1,109 @@
+"""
+Debug traces by category, off unless asked for. Call sites pass a template
+and its args, nothing gets formatted (or written) for a channel below the
+message's level, so leaving traces in hot code costs a compare.
+
+Turn channels on with configure(), or the TOXIC_TRACE environment variable:
+
+    TOXIC_TRACE=combat=debug,procgen=info python main.py
+
+Output goes to stderr, or a buffered file with to_file().
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+import warnings
+from typing import Dict, Optional, TextIO
+
+OFF = 0
+INFO = 1
+DEBUG = 2
+
+LEVELS = {"off": OFF, "info": INFO, "debug": DEBUG}
+
+# bytes buffered before a trace file hits the disk
+FILE_BUFFER_SIZE = 1 << 16
+
+
+class Channel:
+    __slots__ = ("name", "level", "sink")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.level = OFF
+        self.sink: Optional[TextIO] = None  # stderr when None
+
+    def enabled(self, level: int = DEBUG) -> bool:
+        # for guarding a trace whose args are expensive to work out
+        return level <= self.level
+
+    def log(self, level: int, template: str, *args) -> None:
+        if level > self.level:
+            return
+        sink = self.sink or sys.stderr
+        sink.write(f"{self.name}: {template % args if args else template}\n")
+
+    def info(self, template: str, *args) -> None:
+        if INFO <= self.level:
+            self.log(INFO, template, *args)
+
+    def debug(self, template: str, *args) -> None:
+        if DEBUG <= self.level:
+            self.log(DEBUG, template, *args)
+
+
+channels: Dict[str, Channel] = {}
+
+
+def channel(name: str) -> Channel:
+    if name not in channels:
+        channels[name] = Channel(name)
+    return channels[name]
+
+
+combat = channel("combat")
+procgen = channel("procgen")
+
+
+def configure(spec: str) -> None:
+    """
+    Set levels from "name=level,..." ("combat=debug,procgen=info"). Unknown
+    levels are skipped with a warning, a typo in TOXIC_TRACE shouldn't stop
+    the game from starting.
+    """
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, level = part.partition("=")
+        level = level.strip().lower() or "debug"
+        if level not in LEVELS:
+            warnings.warn(
+                f"ignoring trace level {level!r} for {name.strip()!r}, "
+                f"expected one of {', '.join(LEVELS)}"
+            )
+            continue
+        channel(name.strip()).level = LEVELS[level]
+
+
+def to_file(path: str, *names: str) -> None:
+    """
+    Send the named channels (all of them by default) to path, appended and
+    buffered until exit or close_files().
+    """
+    sink = open(path, "a", buffering=FILE_BUFFER_SIZE)
+    for name in names or list(channels):
+        channel(name).sink = sink
+
+
+@atexit.register
+def close_files() -> None:
+    # channels can share a file, closing it twice is harmless
+    for each in channels.values():
+        if each.sink is not None:
+            each.sink.close()
+            each.sink = None
+
+
+configure(os.environ.get("TOXIC_TRACE", ""))